@@ -14,23 +14,47 @@ Principais garantias:
 - Não sobrescreve intents existentes no domain.yml (apenas adiciona novas);
 - Não cria rules/stories duplicadas para a mesma intent (usa detecção por intent+action);
 - Deduplica globalmente exemplos PT/EN (uma frase só aparece uma vez no NLU inteiro);
+- Só regrava questions.yml/responses.yml de intents que mudaram (manifesto em data/.manifest);
 - Garante action_fallback no domain;
-- Garante rule_nlu_fallback e story_nlu_fallback com action_fallback, sem duplicar.
+- Garante rule_nlu_fallback e story_nlu_fallback com action_fallback, sem duplicar;
+- domain/rules/stories são lidos e gravados uma única vez por execução (temp + rename),
+  e só quando o conteúdo muda.
 
 python .\automation_intents.py --max 10
 python .\automation_intents.py --max-pt 8
 python .\automation_intents.py --max-pt 50 --max-en 50
+python .\automation_intents.py --dry-run --changed
+python .\automation_intents.py --force --jobs 4
+python .\automation_intents.py --watch
+python .\automation_intents.py --near-dupes --similarity 0.8
+python .\automation_intents.py --collision-policy drop-all --collision-report reports/collisions.json
+python .\automation_intents.py --layout category   (depois: rasa train --data build/data)
+python .\automation_intents.py --export-json        (depois: python .\run_rasa.py --from-json)
+python .\automation_intents.py --max 60 --sample diverse --seed 7
 """
 
+import io
 import os
 import re
 import sys
-import subprocess
+import json
+import time
+import hashlib
 import argparse
-from typing import Any, Dict, List, Tuple
-
-from ruamel.yaml import YAML
-from ruamel.yaml.scalarstring import LiteralScalarString
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from dedupe import DEFAULT_SIMILARITY, NearDuplicatePruner, PruneResult, load_prune_cache, normalize_example, save_prune_cache
+from deps import ensure_packages
+from input_parser import (
+    COLLISION_POLICIES,
+    DEFAULT_COLLISION_POLICY,
+    Collision,
+    CollisionError,
+    IntentEntry,
+    iter_intents,
+    load_input,
+)
+from sampling import DEFAULT_SAMPLER, DEFAULT_SEED, SAMPLERS, Sampler, make_sampler
 
 # ==========================
 # Configurações gerais
@@ -41,6 +65,10 @@ RASA_VERSION = "3.1"
 DEFAULT_BASE_DIR = "data"
 DEFAULT_INPUT_FILE = "input.txt"
 DEFAULT_DOMAIN_PATH = "domain.yml"
+MANIFEST_FILENAME = ".manifest"
+# Incrementar sempre que o formato de questions.yml/responses.yml gerado mudar
+# (invalida o manifesto e força a regravação de todas as intents)
+GENERATOR_VERSION = 1
 
 
 # ==========================
@@ -64,26 +92,24 @@ def error(msg: str) -> None:
 
 
 # ==========================
-# Dependências
+# ruamel.yaml (import tardio)
 # ==========================
 
-def install_missing_packages() -> None:
-    """Instala pacotes necessários via pip, caso não estejam presentes."""
-    for package in REQUIRED_PACKAGES:
-        try:
-            __import__(package.split(".")[0])
-        except ImportError:
-            info(f"Instalando dependência ausente: {package}")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+# O ruamel só é importado quando algum YAML é realmente lido/emitido pelo ruamel,
+# para que --help, --dry-run sem mudanças etc. não paguem o import.
+_yaml = None
 
 
-# Já rodamos a verificação/instalação antes de configurar o YAML
-install_missing_packages()
+def get_yaml() -> Any:
+    """Instância única do YAML round-trip, configurada no primeiro uso."""
+    global _yaml
+    if _yaml is None:
+        from ruamel.yaml import YAML
 
-# Configure ruamel.yaml
-yaml = YAML()
-yaml.indent(mapping=2, sequence=4, offset=2)
-yaml.allow_unicode = True
+        _yaml = YAML()
+        _yaml.indent(mapping=2, sequence=4, offset=2)
+        _yaml.allow_unicode = True
+    return _yaml
 
 
 # ==========================
@@ -110,248 +136,536 @@ def slug_to_phrase(slug: str) -> str:
 # Parsing do arquivo de entrada
 # ==========================
 
-def parse_limits(block: str, global_max_pt: int | None, global_max_en: int | None, global_max: int | None) -> Tuple[int | None, int | None]:
-    """Resolve limites de exemplos PT/EN considerando tags locais e globais.
+def iter_input(
+    file_path: str,
+    global_max_pt: int | None,
+    global_max_en: int | None,
+    global_max: int | None,
+    use_cache: bool = True,
+    prune: Callable[[List[str]], List[str]] | None = None,
+    collision_policy: str = DEFAULT_COLLISION_POLICY,
+    collision_key: str = "exact",
+    collision_report: str | None = None,
+    sample: Sampler | None = None,
+) -> Iterator[IntentEntry]:
+    """Lê o arquivo de entrada (input.txt) via IR compartilhada e devolve as intents uma a uma.
+
+    A IR vem de input_parser.load_input (cache em .cache/input_ir quando o arquivo não mudou).
+    prune é repassado a input_parser.iter_intents (ver ExamplePruning); exemplos repetidos
+    entre intents seguem collision_policy e são relatados por report_collisions; sample
+    (sampling.make_sampler) decide quais exemplos ficam quando um limite corta a lista.
+    Cada item: (intent_path, [pt_examples], [en_examples], [(vr_pt, vr_en), ...])
 
-    Precedência: #max_pt/#max_en > #max > globais fornecidos em linha de comando.
+    Levanta FileNotFoundError se o input não existe e CollisionError com a política "fail"
+    (depois de relatar as colisões); quem decide se isso encerra o processo é o chamador.
     """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Arquivo de entrada não encontrado: {file_path}")
+
+    parsed = load_input(file_path, use_cache=use_cache)
+    for idx, preview in parsed.ignored:
+        warn(f"Bloco {idx} ignorado (sem #intent:). Prévia: {preview.replace(os.linesep, ' ')}")
+    if parsed.ignored:
+        info(f"{len(parsed.ignored)} bloco(s) ignorados por falta de #intent:.")
+
+    key = COLLISION_KEYS[collision_key]
+    collisions: List[Collision] = []
+    try:
+        yield from iter_intents(
+            parsed, global_max_pt, global_max_en, global_max, prune, collision_policy, key, collisions, sample
+        )
+    except CollisionError as e:
+        report_collisions(e.collisions, collision_policy, collision_report)
+        raise
+    report_collisions(collisions, collision_policy, collision_report)
+
+
+# Como comparar exemplos de intents diferentes: texto exato (histórico) ou forma normalizada (dedupe.py)
+COLLISION_KEYS: Dict[str, Callable[[str], str] | None] = {
+    "exact": None,
+    "normalized": normalize_example,
+}
+COLLISION_PREVIEW = 10
+
+
+def report_collisions(collisions: List[Collision], policy: str, report_path: str | None = None) -> None:
+    """Resumo no console (primeiras COLLISION_PREVIEW) e, opcionalmente, relatório JSON completo."""
+    if report_path:
+        payload = {
+            "policy": policy,
+            "total": len(collisions),
+            "collisions": [
+                {"lang": c.lang, "text": c.text, "intents": list(c.intents), "blocks": list(c.blocks)}
+                for c in collisions
+            ],
+        }
+        write_text_atomic(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", report_path)
 
-    def pick(tag: str) -> int | None:
-        m = re.search(rf"(?mi)^\s*{tag}\s*:\s*(\d+)\s*$", block)
-        return int(m.group(1)) if m else None
-
-    max_pt = pick("#max_pt")
-    max_en = pick("#max_en")
-    max_both = pick("#max")
-
-    if max_both is not None:
-        max_pt = max_pt if max_pt is not None else max_both
-        max_en = max_en if max_en is not None else max_both
-
-    if max_pt is None:
-        max_pt = global_max_pt if global_max_pt is not None else (global_max if global_max is not None else None)
-    if max_en is None:
-        max_en = global_max_en if global_max_en is not None else (global_max if global_max is not None else None)
-
-    return max_pt, max_en
+    if not collisions:
+        return
+    action = {"first-wins": "mantido só na primeira intent", "drop-all": "removido de todas", "fail": "abortando"}[policy]
+    warn(f"{len(collisions)} exemplo(s) aparecem em mais de uma intent ({policy}: {action}).")
+    for c in collisions[:COLLISION_PREVIEW]:
+        print(f"   [{c.lang}] {c.text!r}: {' x '.join(c.intents)} (blocos {', '.join(map(str, c.blocks))})")
+    if len(collisions) > COLLISION_PREVIEW:
+        hint = f"veja {report_path}" if report_path else "use --collision-report arquivo.json para a lista completa"
+        print(f"   ... e mais {len(collisions) - COLLISION_PREVIEW} ({hint})")
 
 
-def extract_list(block: str, tag: str) -> List[str]:
-    """Extrai lista de exemplos após '#pt:' ou '#en:' até próximo marcador/tag/---/EOF.
+class ExamplePruning:
+    """Poda de duplicatas normalizadas/quase-duplicatas por intent (ver dedupe.py).
 
-    Ignora linhas de controle como '#rp', '#rp_1', etc.
-    Retorna uma lista de frases cruas (sem '- ').
+    Usada como `prune` de iter_input; acumula contadores e memoiza os resultados
+    em .cache/near_dupes.pkl (finish() grava só as entradas usadas nesta execução).
     """
-    m = re.search(rf"(?smi)^\s*{re.escape(tag)}\s*:(.*?)(?=^\s*#\w+\s*:|^\s*---\s*$|\Z)", block)
-    if not m:
-        return []
-
-    out: List[str] = []
-    for ln in m.group(1).splitlines():
-        if not ln.strip():
-            continue
-        cleaned = ln.strip().lstrip("-").strip()
-        if not cleaned:
-            continue
-        if re.match(r"^\s*#rp", cleaned, flags=re.IGNORECASE):
-            continue
-        out.append(cleaned)
-
-    return out
-
 
-def strip_markers(text: str) -> str:
-    """Remove linhas de marcador como '#rp_', '#rp', etc., mantendo só conteúdo."""
-    lines = text.strip().splitlines()
-    out: List[str] = []
-    for ln in lines:
-        if re.match(r"^\s*#rp\b", ln, flags=re.IGNORECASE):
-            continue
-        out.append(ln)
-    return "\n".join(out).strip()
+    def __init__(self, similarity: float) -> None:
+        self.pruner = NearDuplicatePruner(similarity)
+        self.cache = load_prune_cache()
+        self.used: Dict[str, PruneResult] = {}
+        self.before = self.exact = self.near = 0
+
+    def __call__(self, examples: List[str]) -> List[str]:
+        key = self.pruner.cache_key(examples)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.pruner.prune(examples)
+        self.used[key] = result
+        self.before += len(examples)
+        self.exact += result.exact
+        self.near += result.near
+        return list(result.kept)
+
+    def finish(self) -> None:
+        removed = self.exact + self.near
+        pct = 100.0 * removed / self.before if self.before else 0.0
+        info(
+            f"🧹 Poda de exemplos: {self.before} -> {self.before - removed} (-{pct:.1f}%): "
+            f"{self.exact} duplicata(s) normalizada(s), {self.near} quase-duplicata(s) "
+            f"(similaridade >= {self.pruner.threshold})"
+        )
+        if self.used.keys() != self.cache.keys():
+            save_prune_cache(self.used)
 
 
-def parse_input(file_path: str, global_max_pt: int | None, global_max_en: int | None, global_max: int | None) -> List[Tuple[str, List[str], List[str], List[Tuple[str, str]]]]:
+def parse_input(file_path: str, global_max_pt: int | None, global_max_en: int | None, global_max: int | None) -> List[IntentEntry]:
     """Lê o arquivo de entrada (input.txt) e devolve uma lista de intents.
 
     Cada item: (intent_path, [pt_examples], [en_examples], [(vr_pt, vr_en), ...])
     """
-    if not os.path.exists(file_path):
-        error(f"Arquivo de entrada não encontrado: {file_path}")
-        sys.exit(1)
+    return list(iter_input(file_path, global_max_pt, global_max_en, global_max))
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
 
-    # separa blocos por linhas contendo só --- (tolerante a espaços)
-    blocks = [b for b in re.split(r"(?m)^\s*---\s*$", content) if b.strip()]
+# ==========================
+# Geração de arquivos questions.yml / responses.yml
+# ==========================
 
-    intents: List[Tuple[str, List[str], List[str], List[Tuple[str, str]]]] = []
-    seen_pt: set[str] = set()
-    seen_en: set[str] = set()
-    ignored = 0
+def clean_multiline_response(text: str) -> str:
+    cleaned = text.strip()
+    if cleaned.startswith("|"):
+        cleaned = cleaned.lstrip("|").strip()
+    return cleaned + "\n"
 
-    def dedupe_global(lines: List[str], seen_global: set[str]) -> List[str]:
-        out_local: List[str] = []
-        for entry in lines:
-            if entry and entry not in seen_global:
-                seen_global.add(entry)
-                out_local.append(entry)
-        return out_local
 
-    for idx, raw in enumerate(blocks, 1):
-        block = raw.strip()
-        if not block:
-            continue
+def prepare_intent(intent_path: str, pt_examples: List[str], en_examples: List[str], response_array: List[Tuple[str, str]]) -> Tuple[str, List[str], List[Tuple[str, str]]]:
+    """(nome, exemplos PT+EN, respostas limpas) exatamente como vão para data/*, com os fallbacks."""
+    name = normalize_intent_name(intent_path)
+    examples = pt_examples + en_examples
 
-        m_intent = re.search(r"(?mi)^\s*#intent\s*:\s*(.+)$", block)
-        if not m_intent:
-            warn(f"Bloco {idx} ignorado (sem #intent:). Prévia: {block[:120].replace(os.linesep, ' ')}")
-            ignored += 1
-            continue
-        intent = m_intent.group(1).strip()
-
-        # Limites por bloco + globais
-        max_pt, max_en = parse_limits(block, global_max_pt, global_max_en, global_max)
-
-        # exemplos PT/EN (opcionais)
-        pt_examples = extract_list(block, "#pt")
-        en_examples = extract_list(block, "#en")
-
-        # limpar e deduplicar globalmente (ninguém repete exemplo em lugar nenhum)
-        pt_examples = dedupe_global(list(dict.fromkeys(pt_examples)), seen_pt)
-        en_examples = dedupe_global(list(dict.fromkeys(en_examples)), seen_en)
-
-        # aplicar limites por bloco, se houver
-        if max_pt is not None:
-            pt_examples = pt_examples[:max_pt]
-        if max_en is not None:
-            en_examples = en_examples[:max_en]
-
-        # pares de respostas (#vr_pt: ... #vr_en: ...) — suporta múltiplos
-        response_array: List[Tuple[str, str]] = []
-        pattern = re.compile(
-            r"(?smi)^\s*#vr_pt\s*:(.*?)^\s*#vr_en\s*:(.*?)(?="
-            r"^\s*#vr_pt\s*:|^\s*#\w+\s*:|^\s*#rp[^\n]*$|^\s*---\s*$|\Z)"
-        )
-        for m in pattern.finditer(block):
-            pt = strip_markers(m.group(1))
-            en = strip_markers(m.group(2))
-            if pt and en:
-                response_array.append((pt, en))
+    # Fallback se nenhum exemplo foi encontrado
+    if not examples:
+        phrase = slug_to_phrase(name)
+        examples = [f"{phrase}?", phrase]
 
-        intents.append((intent, pt_examples, en_examples, response_array))
+    # Fallback de respostas para não quebrar Rasa
+    if not response_array:
+        response_array = [("TODO: adicionar resposta em PT", "TODO: add response in EN")]
 
-    if ignored:
-        info(f"{ignored} bloco(s) ignorados por falta de #intent:.")
+    # Pares resp_1, resp_2, ..., resp_N já no formato de bloco literal (terminando em \n)
+    responses = [(clean_multiline_response(pt), clean_multiline_response(en)) for pt, en in response_array]
+    return name, examples, responses
 
-    return intents
+
+def create_files(intent_path: str, pt_examples: List[str], en_examples: List[str], response_array: List[Tuple[str, str]], base_dir: str) -> None:
+    """Cria/atualiza questions.yml e responses.yml para uma intent específica."""
+    name, examples, responses = prepare_intent(intent_path, pt_examples, en_examples, response_array)
+    folder = intent_folder(intent_path, base_dir)
+    os.makedirs(folder, exist_ok=True)
+
+    examples_text = "".join(f"- {ex}\n" for ex in examples)
+    questions_yml, responses_yml = render_intent_files(name, examples_text, responses)
+
+    with open(os.path.join(folder, "questions.yml"), "w", encoding="utf-8") as qf:
+        qf.write(questions_yml)
+    with open(os.path.join(folder, "responses.yml"), "w", encoding="utf-8") as rf:
+        rf.write(responses_yml)
 
 
 # ==========================
-# Geração de arquivos questions.yml / responses.yml
+# Emissores de YAML para questions.yml / responses.yml
 # ==========================
+#
+# "ruamel" faz o dump round-trip completo; "fast" monta o texto direto para os dois
+# esquemas fixos acima, reproduzindo byte a byte a saída do ruamel. Quando algum valor
+# sai do caso simples (nome que precisaria de aspas, quebras de linha exóticas,
+# indicador de indentação/chomping no bloco literal...), o "fast" devolve None e o
+# documento é emitido pelo ruamel.
 
-def clean_multiline_response(text: str) -> LiteralScalarString:
-    cleaned = text.strip()
-    if cleaned.startswith("|"):
-        cleaned = cleaned.lstrip("|").strip()
-    return LiteralScalarString(cleaned + "\n")
+DEFAULT_EMITTER = "fast"
+PLAIN_SCALAR_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+RESERVED_PLAIN_SCALARS = {"true", "false", "null"}
+LITERAL_UNSAFE_RE = re.compile("[\r\x85\u2028\u2029]")
+QUOTED_VERSION_RE = re.compile(r"^\d+\.\d+$")
 
+emitter_name = DEFAULT_EMITTER
 
-def create_files(intent_path: str, pt_examples: List[str], en_examples: List[str], response_array: List[Tuple[str, str]], base_dir: str) -> None:
-    """Cria/atualiza questions.yml e responses.yml para uma intent específica."""
-    name = normalize_intent_name(intent_path)
-    folder = os.path.join(base_dir, *intent_path.split("/"))
-    os.makedirs(folder, exist_ok=True)
 
-    formatted_pt = "".join(f"- {ex}\n" for ex in pt_examples)
-    formatted_en = "".join(f"- {ex}\n" for ex in en_examples)
+def set_emitter(name: str) -> None:
+    """Seleciona o backend de emissão (também usado como initializer do pool de processos)."""
+    global emitter_name
+    if name not in EMITTERS:
+        raise ValueError(f"Emissor desconhecido: {name}")
+    emitter_name = name
 
-    examples_text = (formatted_pt + formatted_en).rstrip("\n")
 
-    # Fallback se nenhum exemplo foi encontrado
-    if not examples_text:
-        phrase = slug_to_phrase(name)
-        examples_text = f"- {phrase}?\n- {phrase}"
+def dump_yaml_to_string(data: Dict[str, Any]) -> str:
+    stream = io.StringIO()
+    get_yaml().dump(data, stream)
+    return stream.getvalue()
+
+
+def render_questions_ruamel(name: str, examples: str) -> str | None:
+    from ruamel.yaml.scalarstring import LiteralScalarString
 
     questions: Dict[str, Any] = {
         "version": RASA_VERSION,
         "nlu": [
             {
                 "intent": name,
-                "examples": LiteralScalarString(examples_text + "\n"),
+                "examples": LiteralScalarString(examples),
             }
         ],
     }
+    return dump_yaml_to_string(questions)
 
-    # Fallback de respostas para não quebrar Rasa
-    if not response_array:
-        response_array = [("TODO: adicionar resposta em PT", "TODO: add response in EN")]
 
-    # Monta custom com resp_1, resp_2, ..., resp_N
+def response_variations(responses: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Valor de utter_<intent>: um único custom com resp_1, resp_2, ..., resp_N."""
+    from ruamel.yaml.scalarstring import LiteralScalarString
+
     custom_payload: Dict[str, Dict[str, LiteralScalarString]] = {}
-    for idx, (pt, en) in enumerate(response_array, start=1):
-        resp_key = f"resp_{idx}"
-        custom_payload[resp_key] = {
-            "vr_pt": clean_multiline_response(pt),
-            "vr_en": clean_multiline_response(en),
+    for idx, (pt, en) in enumerate(responses, start=1):
+        custom_payload[f"resp_{idx}"] = {
+            "vr_pt": LiteralScalarString(pt),
+            "vr_en": LiteralScalarString(en),
         }
+    return [{"custom": custom_payload}]
 
-    responses: Dict[str, Any] = {
+
+def render_responses_ruamel(name: str, responses: List[Tuple[str, str]]) -> str | None:
+    data: Dict[str, Any] = {
         "version": RASA_VERSION,
         "responses": {
-            f"utter_{name}": [
-                {
-                    "custom": custom_payload,
-                }
-            ]
+            f"utter_{name}": response_variations(responses),
         },
     }
+    return dump_yaml_to_string(data)
 
-    with open(os.path.join(folder, "questions.yml"), "w", encoding="utf-8") as qf:
-        yaml.dump(questions, qf)
-    with open(os.path.join(folder, "responses.yml"), "w", encoding="utf-8") as rf:
-        yaml.dump(responses, rf)
+
+def fast_version_line() -> str | None:
+    # "3.1" é resolvido como float pelo YAML, então o ruamel emite entre aspas simples
+    if not QUOTED_VERSION_RE.match(RASA_VERSION):
+        return None
+    return f"version: '{RASA_VERSION}'\n"
+
+
+def fast_plain_scalar(value: str) -> bool:
+    return bool(PLAIN_SCALAR_RE.match(value)) and value.lower() not in RESERVED_PLAIN_SCALARS
+
+
+def fast_literal_block(text: str, indent: int) -> str | None:
+    """Corpo de um bloco literal '|' (clip) como o ruamel emite; None fora do caso simples."""
+    body = text[:-1]
+    if not text.endswith("\n") or not body or body[0] in " \t\n" or body.endswith("\n"):
+        return None
+    if LITERAL_UNSAFE_RE.search(body):
+        return None
+    pad = " " * indent
+    return "".join(f"{pad}{ln}\n" if ln else "\n" for ln in body.split("\n"))
+
+
+def render_questions_fast(name: str, examples: str) -> str | None:
+    version = fast_version_line()
+    block = fast_literal_block(examples, 6)
+    if version is None or block is None or not fast_plain_scalar(name):
+        return None
+    return f"{version}nlu:\n  - intent: {name}\n    examples: |\n{block}"
+
+
+def render_responses_fast(name: str, responses: List[Tuple[str, str]]) -> str | None:
+    version = fast_version_line()
+    if version is None or not fast_plain_scalar(name):
+        return None
+
+    parts = [version, "responses:\n", f"  utter_{name}:\n", "    - custom:\n"]
+    for idx, (pt, en) in enumerate(responses, start=1):
+        pt_block = fast_literal_block(pt, 12)
+        en_block = fast_literal_block(en, 12)
+        if pt_block is None or en_block is None:
+            return None
+        parts.append(f"        resp_{idx}:\n          vr_pt: |\n{pt_block}          vr_en: |\n{en_block}")
+    return "".join(parts)
+
+
+# nome -> (render_questions, render_responses); cada função pode devolver None para cair no ruamel
+EMITTERS: Dict[str, Tuple[Callable[[str, str], str | None], Callable[[str, List[Tuple[str, str]]], str | None]]] = {
+    "fast": (render_questions_fast, render_responses_fast),
+    "ruamel": (render_questions_ruamel, render_responses_ruamel),
+}
+
+
+def render_intent_files(name: str, examples: str, responses: List[Tuple[str, str]], emitter: str | None = None) -> Tuple[str, str]:
+    """Devolve o texto de (questions.yml, responses.yml) usando o emissor selecionado."""
+    render_questions, render_responses = EMITTERS[emitter or emitter_name]
+    questions_yml = render_questions(name, examples)
+    if questions_yml is None:
+        questions_yml = render_questions_ruamel(name, examples)
+    responses_yml = render_responses(name, responses)
+    if responses_yml is None:
+        responses_yml = render_responses_ruamel(name, responses)
+    return questions_yml, responses_yml  # type: ignore[return-value]
 
 
 # ==========================
-# Helpers de YAML
+# Manifesto de geração incremental (data/.manifest)
 # ==========================
 
-def load_yaml(path: str) -> Dict[str, Any]:
-    if os.path.exists(path):
+def intent_digest(intent_path: str, pt_examples: List[str], en_examples: List[str], response_array: List[Tuple[str, str]]) -> str:
+    """Hash do conteúdo que define questions.yml/responses.yml de uma intent."""
+    payload = json.dumps(
+        [GENERATOR_VERSION, RASA_VERSION, intent_path, pt_examples, en_examples, response_array],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def intent_folder(intent_path: str, base_dir: str) -> str:
+    return os.path.join(base_dir, *intent_path.split("/"))
+
+
+def file_stamps(folder: str) -> Dict[str, List[int]] | None:
+    """(tamanho, mtime_ns) de questions.yml e responses.yml; None se algum não existir."""
+    stamps: Dict[str, List[int]] = {}
+    for filename in ("questions.yml", "responses.yml"):
+        try:
+            st = os.stat(os.path.join(folder, filename))
+        except OSError:
+            return None
+        stamps[filename] = [st.st_size, st.st_mtime_ns]
+    return stamps
+
+
+def load_manifest(base_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Lê data/.manifest (intent_path -> {hash, files}); manifesto ausente/inválido = vazio."""
+    path = os.path.join(base_dir, MANIFEST_FILENAME)
+    try:
         with open(path, "r", encoding="utf-8") as f:
-            return yaml.load(f) or {}
-    return {}
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != GENERATOR_VERSION:
+        return {}
+    intents = data.get("intents")
+    return intents if isinstance(intents, dict) else {}
 
 
-def save_yaml(data: Dict[str, Any], path: str) -> None:
+def save_manifest(manifest: Dict[str, Dict[str, Any]], base_dir: str) -> None:
+    path = os.path.join(base_dir, MANIFEST_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": GENERATOR_VERSION, "intents": manifest}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_intent_up_to_date(entry: Dict[str, Any] | None, digest: str, folder: str) -> bool:
+    """A intent pode ser pulada se o hash bate e os arquivos no disco são os que gravamos.
+
+    Comparar tamanho/mtime detecta arquivos apagados ou editados à mão desde a última geração.
+    """
+    if not entry or entry.get("hash") != digest:
+        return False
+    return entry.get("files") == file_stamps(folder)
+
+
+# ==========================
+# Escrita (serial ou em paralelo) das intents alteradas
+# ==========================
+
+# (intent_path, [pt], [en], [(vr_pt, vr_en), ...], base_dir)
+WriteTask = Tuple[str, List[str], List[str], List[Tuple[str, str]], str]
+
+
+def write_intent_task(task: WriteTask) -> Dict[str, List[int]] | None:
+    """Grava uma intent e devolve os stamps dos arquivos (roda também em processos filhos)."""
+    intent_path, pt, en, response_array, base_dir = task
+    create_files(intent_path, pt, en, response_array, base_dir)
+    return file_stamps(intent_folder(intent_path, base_dir))
+
+
+def write_intents(tasks: List[WriteTask], jobs: int) -> Iterator[Tuple[WriteTask, Dict[str, List[int]] | None]]:
+    """Grava as intents em ordem; com jobs > 1 usa um pool de processos.
+
+    Cada intent escreve só na própria pasta, e os resultados voltam na ordem das
+    tasks (executor.map), então a saída é idêntica à do caminho serial.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield task, write_intent_task(task)
+        return
+
+    workers = min(jobs, len(tasks))
+    chunksize = max(1, len(tasks) // (workers * 4))
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_emitter, initargs=(emitter_name,)) as executor:
+        yield from zip(tasks, executor.map(write_intent_task, tasks, chunksize=chunksize))
+
+
+# ==========================
+# Helpers de YAML
+# ==========================
+
+def load_yaml_document(path: str) -> Tuple[str | None, Dict[str, Any]]:
+    """Lê o arquivo uma única vez e devolve (texto original ou None se não existir, dados)."""
+    if not os.path.exists(path):
+        return None, {}
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    return text, get_yaml().load(text) or {}
+
+
+def write_text_atomic(text: str, path: str) -> None:
+    """Grava via arquivo temporário + rename: o arquivo nunca fica pela metade."""
     parent = os.path.dirname(path)
     if parent:
         os.makedirs(parent, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        yaml.dump(data, f)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_changed_files(outputs: Dict[str, str]) -> int:
+    """Grava (atomicamente) só os arquivos cujo conteúdo mudou; devolve quantos foram gravados."""
+    written = 0
+    for path, text in outputs.items():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == text:
+                    continue
+        except OSError:
+            pass
+        write_text_atomic(text, path)
+        written += 1
+    return written
+
+
+def save_yaml(data: Dict[str, Any], path: str) -> None:
+    write_text_atomic(dump_yaml_to_string(data), path)
 
 
 # ==========================
 # Descoberta de intents na pasta data
 # ==========================
 
-def get_all_intents_in_data_folder(base_dir: str) -> List[str]:
-    """Percorre data/* e devolve caminhos relativos que contêm questions.yml."""
-    intents: List[str] = []
+# Manifesto da árvore data/: diretório relativo -> [mtime_ns, [[nome, é_dir], ...]], com
+# só as subpastas e o questions.yml de cada diretório, na ordem de sorted(). O mtime de
+# um diretório muda quando entradas são criadas/removidas/renomeadas nele, então um
+# diretório com o mesmo mtime não precisa ser relistado (as subpastas ainda recebem stat).
+DATA_TREE_CACHE_DIR = os.path.join(".cache", "data_tree")
+DATA_TREE_VERSION = 1
+# mtimes mais novos que isso (em relação ao início da varredura) não entram no cache:
+# o diretório ainda pode mudar dentro da mesma "batida" do relógio do filesystem
+RACY_MTIME_NS = 2_000_000_000
+
+
+def data_tree_cache_path(base_dir: str) -> str:
+    key = hashlib.sha256(os.path.abspath(base_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(DATA_TREE_CACHE_DIR, f"{key}.json")
+
+
+def load_data_tree_cache(base_dir: str) -> Dict[str, List[Any]]:
+    try:
+        with open(data_tree_cache_path(base_dir), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != DATA_TREE_VERSION:
+        return {}
+    dirs = data.get("dirs")
+    return dirs if isinstance(dirs, dict) else {}
+
+
+def save_data_tree_cache(base_dir: str, dirs: Dict[str, List[Any]]) -> None:
+    path = data_tree_cache_path(base_dir)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_text_atomic(json.dumps({"version": DATA_TREE_VERSION, "dirs": dirs}, ensure_ascii=False), path)
+    except OSError:
+        pass
+
 
-    def recurse(path: str) -> None:
-        for e in sorted(os.listdir(path)):
-            full = os.path.join(path, e)
-            if os.path.isdir(full):
-                recurse(full)
-            elif e == "questions.yml":
-                rel = os.path.relpath(path, base_dir).replace("\\", "/")
-                intents.append(rel)
+def get_all_intents_in_data_folder(base_dir: str, use_cache: bool = True) -> List[str]:
+    """Percorre data/* e devolve caminhos relativos que contêm questions.yml.
 
-    recurse(base_dir)
+    Usa os.scandir (o tipo de cada entrada vem do próprio dirent) e, com use_cache,
+    o manifesto em .cache/data_tree para não relistar diretórios que não mudaram.
+    """
+    intents: List[str] = []
+    cached = load_data_tree_cache(base_dir) if use_cache else {}
+    fresh: Dict[str, List[Any]] = {}
+    racy_after = time.time_ns() - RACY_MTIME_NS
+
+    def list_dir(path: str) -> List[List[Any]]:
+        children: List[List[Any]] = []
+        with os.scandir(path) as it:
+            for e in it:
+                if e.is_dir():
+                    children.append([e.name, True])
+                elif e.name == "questions.yml":
+                    children.append([e.name, False])
+        children.sort()
+        return children
+
+    def recurse(path: str, rel: str, mtime_ns: int) -> None:
+        entry = cached.get(rel)
+        if entry is not None and entry[0] == mtime_ns:
+            children = entry[1]
+        else:
+            children = list_dir(path)
+        if mtime_ns < racy_after:
+            fresh[rel] = [mtime_ns, children]
+
+        for name, is_dir in children:
+            if not is_dir:
+                intents.append(rel or ".")
+                continue
+            full = os.path.join(path, name)
+            try:
+                child_mtime = os.stat(full).st_mtime_ns
+            except OSError:
+                continue
+            recurse(full, f"{rel}/{name}" if rel else name, child_mtime)
+
+    recurse(base_dir, "", os.stat(base_dir).st_mtime_ns)
+    if use_cache and fresh != cached:
+        save_data_tree_cache(base_dir, fresh)
     return intents
 
 
@@ -359,18 +673,68 @@ def get_all_intents_in_data_folder(base_dir: str) -> List[str]:
 # Sincronização domain / rules / stories
 # ==========================
 
-def ensure_all_data_intents_registered(base_dir: str, domain_path: str, rules_path: str, stories_path: str) -> None:
-    """Sincroniza domain.yml, rules.yml e stories.yml com as intents geradas em data/.
+def target_actions_for(intent_name: str) -> Tuple[str, ...]:
+    """Actions que "atendem" uma intent numa rule/story."""
+    # CASO ESPECIAL: nlu_fallback -> pode ser utter_nlu_fallback OU action_fallback
+    if intent_name == "nlu_fallback":
+        return (f"utter_{intent_name}", "action_fallback")
+    # para intents normais, procura utter_{intent}
+    return (f"utter_{intent_name}",)
+
+
+def index_intent_actions(entries: List[Any]) -> set[Tuple[str, str]]:
+    """Índice (intent, action) de todas as rules/stories, montado numa única passada.
+
+    Um par entra no índice quando a mesma rule/story tem um step com a intent e outro
+    com uma das actions alvo dela (ver target_actions_for).
+    """
+    index: set[Tuple[str, str]] = set()
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+
+        steps = entry.get("steps") or []
+        step_intents = {s.get("intent") for s in steps if isinstance(s, dict) and isinstance(s.get("intent"), str)}
+        if not step_intents:
+            continue
+        step_actions = {s.get("action") for s in steps if isinstance(s, dict) and isinstance(s.get("action"), str)}
+
+        for intent_name in step_intents:
+            for action in target_actions_for(intent_name):
+                if action in step_actions:
+                    index.add((intent_name, action))
+    return index
+
+
+def add_missing_entries(entries: List[Any], all_intents: List[str], kind: str) -> int:
+    """Acrescenta uma rule/story padrão (intent -> utter_intent) para cada intent sem par no índice.
+
+    kind: "rule" ou "story". Custo linear em (steps existentes + intents).
+    """
+    index = index_intent_actions(entries)
+    added = 0
+    for it in all_intents:
+        if any((it, action) in index for action in target_actions_for(it)):
+            continue
+        entries.append(
+            {
+                kind: f"{kind}_{it}",
+                "steps": [{"intent": it}, {"action": f"utter_{it}"}],
+            }
+        )
+        index.add((it, f"utter_{it}"))
+        added += 1
+    return added
+
+
+def register_data_intents(domain: Dict[str, Any], rules: Dict[str, Any], stories: Dict[str, Any], all_intents: List[str]) -> None:
+    """Sincroniza (em memória) domain, rules e stories com as intents geradas em data/.
 
     - Não sobrescreve nada existente em domain.yml (só acrescenta intents novas e action_fallback se faltar);
     - Cria rules/story padrão (intent -> utter_intent) apenas se ainda não existir;
     - Trata nlu_fallback como caso especial (aceita action_fallback ou utter_nlu_fallback).
     """
 
-    domain = load_yaml(domain_path)
-    rules = load_yaml(rules_path)
-    stories = load_yaml(stories_path)
-
     domain.setdefault("version", RASA_VERSION)
     domain.setdefault("intents", [])
     domain.setdefault("actions", [])
@@ -388,91 +752,25 @@ def ensure_all_data_intents_registered(base_dir: str, domain_path: str, rules_pa
     stories.setdefault("version", RASA_VERSION)
     stories.setdefault("stories", [])
 
-    # Intents descobertas na pasta data
-    all_intents = sorted(set(normalize_intent_name(i) for i in get_all_intents_in_data_folder(base_dir)))
-
     # --- DOMAIN.INTENTS: adiciona apenas as que não existem ---
     existing_intents: List[str] = domain.get("intents") or []
+    known_intents = {it for it in existing_intents if isinstance(it, str)}
     added_intents = 0
     for it in all_intents:
-        if it not in existing_intents:
+        if it not in known_intents:
             existing_intents.append(it)
+            known_intents.add(it)
             added_intents += 1
     domain["intents"] = existing_intents
 
     # --- RULES: para cada intent, garante uma regra (intent -> utter_intent) se não existir ---
     existing_rules: List[Dict[str, Any]] = rules.get("rules") or []
-
-    def has_rule_for_intent(intent_name: str) -> bool:
-        for r in existing_rules:
-            if not isinstance(r, dict):
-                continue
-
-            steps = r.get("steps") or []
-            has_intent = any(isinstance(s, dict) and s.get("intent") == intent_name for s in steps)
-            if not has_intent:
-                continue
-
-            # para intents normais, procura utter_{intent}
-            target_actions = {f"utter_{intent_name}"}
-
-            # CASO ESPECIAL: nlu_fallback -> pode ser utter_nlu_fallback OU action_fallback
-            if intent_name == "nlu_fallback":
-                target_actions.add("action_fallback")
-
-            has_action = any(isinstance(s, dict) and s.get("action") in target_actions for s in steps)
-
-            if has_action:
-                return True
-
-        return False
-
-    added_rules = 0
-    for it in all_intents:
-        if not has_rule_for_intent(it):
-            existing_rules.append(
-                {
-                    "rule": f"rule_{it}",
-                    "steps": [{"intent": it}, {"action": f"utter_{it}"}],
-                }
-            )
-            added_rules += 1
+    added_rules = add_missing_entries(existing_rules, all_intents, "rule")
     rules["rules"] = existing_rules
 
     # --- STORIES: para cada intent, garante uma história (intent -> utter_intent) se não existir ---
     existing_stories: List[Dict[str, Any]] = stories.get("stories") or []
-
-    def has_story_for_intent(intent_name: str) -> bool:
-        for s in existing_stories:
-            if not isinstance(s, dict):
-                continue
-
-            steps = s.get("steps") or []
-            has_intent = any(isinstance(st, dict) and st.get("intent") == intent_name for st in steps)
-            if not has_intent:
-                continue
-
-            target_actions = {f"utter_{intent_name}"}
-            if intent_name == "nlu_fallback":
-                target_actions.add("action_fallback")
-
-            has_action = any(isinstance(st, dict) and st.get("action") in target_actions for st in steps)
-
-            if has_action:
-                return True
-
-        return False
-
-    added_stories = 0
-    for it in all_intents:
-        if not has_story_for_intent(it):
-            existing_stories.append(
-                {
-                    "story": f"story_{it}",
-                    "steps": [{"intent": it}, {"action": f"utter_{it}"}],
-                }
-            )
-            added_stories += 1
+    added_stories = add_missing_entries(existing_stories, all_intents, "story")
     stories["stories"] = existing_stories
 
     # --- FALLBACK: garante SOMENTE a action 'action_fallback' no domain ---
@@ -482,10 +780,6 @@ def ensure_all_data_intents_registered(base_dir: str, domain_path: str, rules_pa
         domain["actions"] = actions
         info("Action 'action_fallback' adicionada em domain.yml")
 
-    save_yaml(domain, domain_path)
-    save_yaml(rules, rules_path)
-    save_yaml(stories, stories_path)
-
     success(
         f"Sincronizado domain/rules/stories com intents de data/ (+{added_intents} intents, +{added_rules} rules, +{added_stories} stories)."
     )
@@ -495,8 +789,8 @@ def ensure_all_data_intents_registered(base_dir: str, domain_path: str, rules_pa
 # Fallback rule/story
 # ==========================
 
-def append_fallback_rule_and_story(rules_path: str, stories_path: str) -> None:
-    """Normaliza fallback em rules.yml e stories.yml.
+def normalize_fallback_rule_and_story(rules: Dict[str, Any], stories: Dict[str, Any]) -> None:
+    """Normaliza (em memória) o fallback em rules.yml e stories.yml.
 
     - Toda combinação (intent: nlu_fallback + action: utter_nlu_fallback) vira action_fallback;
     - Garante rule_nlu_fallback e story_nlu_fallback com action_fallback, sem duplicar.
@@ -505,7 +799,6 @@ def append_fallback_rule_and_story(rules_path: str, stories_path: str) -> None:
     FALLBACK_ACTION = "action_fallback"
 
     # ========== RULES ==========
-    rules = load_yaml(rules_path)
     rules.setdefault("version", RASA_VERSION)
     rules.setdefault("rules", [])
 
@@ -556,10 +849,7 @@ def append_fallback_rule_and_story(rules_path: str, stories_path: str) -> None:
     else:
         success("Regras de fallback já usam action_fallback em rules.yml")
 
-    save_yaml(rules, rules_path)
-
     # ========== STORIES ==========
-    stories = load_yaml(stories_path)
     stories.setdefault("version", RASA_VERSION)
     stories.setdefault("stories", [])
 
@@ -610,23 +900,449 @@ def append_fallback_rule_and_story(rules_path: str, stories_path: str) -> None:
     else:
         success("Stories de fallback já usam action_fallback em stories.yml")
 
-    save_yaml(stories, stories_path)
+
+# ==========================
+# Transação domain / rules / stories
+# ==========================
+
+def sync_domain_rules_stories(base_dir: str, domain_path: str, rules_path: str, stories_path: str) -> None:
+    """Sincroniza intents + fallback de domain.yml, rules.yml e stories.yml numa única transação.
+
+    Cada arquivo é lido e parseado uma vez; registro de intents e normalização do
+    fallback são aplicados em memória; só depois de serializar os três documentos
+    os arquivos que mudaram são gravados (temp + rename). Arquivo inalterado não é
+    reescrito; arquivo ausente é criado com os defaults.
+    """
+    paths = (domain_path, rules_path, stories_path)
+    documents = [load_yaml_document(path) for path in paths]
+    domain, rules, stories = (data for _, data in documents)
+
+    # Intents descobertas na pasta data
+    all_intents = sorted(set(normalize_intent_name(i) for i in get_all_intents_in_data_folder(base_dir)))
+
+    # 1) Registra as intents de data/ sem duplicar
+    register_data_intents(domain, rules, stories, all_intents)
+
+    # 2) Normaliza a rule/story de fallback (sem duplicar)
+    normalize_fallback_rule_and_story(rules, stories)
+
+    # 3) Serializa tudo antes de gravar qualquer arquivo
+    rendered = [
+        (path, original, dump_yaml_to_string(data))
+        for path, (original, _), data in zip(paths, documents, (domain, rules, stories))
+    ]
+
+    written = 0
+    for path, original, text in rendered:
+        if text == original:
+            continue
+        write_text_atomic(text, path)
+        written += 1
+        if original is None:
+            info(f"Arquivo criado: {path}")
+
+    info(f"domain/rules/stories: {written} arquivo(s) gravado(s), {len(paths) - written} inalterado(s).")
 
 
 # ==========================
-# Arquivos default
+# Layouts consolidados (--layout category|bundle)
 # ==========================
+#
+# data/ continua com uma pasta por intent (fonte do domain/rules/stories e do manifesto).
+# Os layouts consolidados são derivados dela numa pasta à parte (--bundle-dir), pronta
+# para `rasa train --data build/data`: um nlu.yml + um responses.yml por categoria
+# (primeiro segmento do caminho) ou um único par para tudo, mais cópias dos .yml da raiz
+# de data/ (rules.yml, stories.yml...). Os arquivos gravados ficam listados em
+# <bundle-dir>/.bundle_manifest e só eles são removidos quando saem do layout atual;
+# qualquer outro arquivo da pasta é preservado.
+
+LAYOUTS = ("intent", "category", "bundle")
+DEFAULT_LAYOUT = "intent"
+DEFAULT_BUNDLE_DIR = os.path.join("build", "data")
+BUNDLE_FILES = {"questions.yml": "nlu.yml", "responses.yml": "responses.yml"}
+BUNDLE_MANIFEST_FILENAME = ".bundle_manifest"
+BUNDLE_MANIFEST_VERSION = 1
+TOP_LEVEL_SECTION_RE = re.compile(r"^([A-Za-z_]\w*):[ \t]*$")
+
+
+def split_yaml_sections(text: str) -> List[Tuple[str, str]] | None:
+    """Separa um documento simples em [(chave de topo, corpo indentado)], ignorando `version`.
+
+    Devolve None se o texto tiver algo fora desse formato (comentário na coluna 0,
+    valor em linha, vários documentos...); nesse caso o chamador usa o ruamel.
+    """
+    sections: List[Tuple[str, List[str]]] = []
+    for line in text.splitlines(keepends=True):
+        if line.startswith("version:"):
+            continue
+        match = TOP_LEVEL_SECTION_RE.match(line)
+        if match:
+            sections.append((match.group(1), []))
+        elif sections and (line.startswith((" ", "\t")) or not line.strip()):
+            sections[-1][1].append(line)
+        else:
+            return None
+    return [(key, "".join(body)) for key, body in sections]
+
+
+def yaml_sections(path: str) -> List[Tuple[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    sections = split_yaml_sections(text)
+    if sections is None:
+        data = get_yaml().load(text) or {}
+        sections = [
+            (key, dump_yaml_to_string({key: value}).split("\n", 1)[1])
+            for key, value in data.items()
+            if key != "version"
+        ]
+    return sections
+
+
+def split_mapping_entries(body: str) -> List[Tuple[str, str]] | None:
+    """Quebra o corpo de uma seção-mapa em (chave, texto) no nível 2; None se for lista."""
+    entries: List[Tuple[str, List[str]]] = []
+    for line in body.splitlines(keepends=True):
+        if line.startswith("  ") and not line.startswith(("   ", "  -", "  #")) and line.strip():
+            entries.append((line[2:].split(":", 1)[0].strip(), [line]))
+        elif entries:
+            entries[-1][1].append(line)
+        elif line.strip():
+            return None
+    return [(key, "".join(lines)) for key, lines in entries]
+
+
+def render_bundle(paths: List[str]) -> str:
+    """Concatena as seções de vários arquivos num documento só.
+
+    Seções-lista (nlu) são concatenadas; em seções-mapa (responses) uma chave repetida
+    (mesmo nome de intent em categorias diferentes) fica só com a primeira ocorrência.
+    """
+    merged: Dict[str, List[str]] = {}
+    seen_keys: Dict[str, set[str]] = {}
+    for path in paths:
+        for section, body in yaml_sections(path):
+            bodies = merged.setdefault(section, [])
+            entries = split_mapping_entries(body)
+            if entries is None:
+                bodies.append(body)
+                continue
+            seen = seen_keys.setdefault(section, set())
+            for key, text in entries:
+                if key in seen:
+                    warn(f"'{section}.{key}' repetida em {path}; o bundle mantém a primeira ocorrência.")
+                    continue
+                seen.add(key)
+                bodies.append(text)
+    version = fast_version_line() or dump_yaml_to_string({"version": RASA_VERSION})
+    return version + "".join(f"{key}:\n{''.join(bodies)}" for key, bodies in merged.items())
+
+
+def bundle_dir_conflict(bundle_dir: str, protected_dirs: List[str]) -> str | None:
+    """Diretório protegido (data/, raiz do projeto) que bundle_dir é ou contém; None se não há conflito."""
+    bundle = os.path.realpath(bundle_dir)
+    for protected in protected_dirs:
+        real = os.path.realpath(protected)
+        if real == bundle or real.startswith(bundle.rstrip(os.sep) + os.sep):
+            return protected
+    return None
+
+
+def load_bundle_manifest(bundle_dir: str) -> List[str]:
+    """Arquivos (relativos a bundle_dir) gravados pelo layout anterior."""
+    try:
+        with open(os.path.join(bundle_dir, BUNDLE_MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict) or data.get("version") != BUNDLE_MANIFEST_VERSION:
+        return []
+    files = data.get("files")
+    return [p for p in files if isinstance(p, str)] if isinstance(files, list) else []
+
+
+def save_bundle_manifest(bundle_dir: str, files: List[str]) -> None:
+    payload = {"version": BUNDLE_MANIFEST_VERSION, "files": sorted(files)}
+    write_text_atomic(json.dumps(payload, ensure_ascii=False, indent=1), os.path.join(bundle_dir, BUNDLE_MANIFEST_FILENAME))
+
+
+def write_layout_bundles(base_dir: str, bundle_dir: str, layout: str) -> None:
+    """Regrava (só o que mudou) os arquivos consolidados de data/ em bundle_dir."""
+    groups: Dict[str, Dict[str, List[str]]] = {}
+    for intent_path in get_all_intents_in_data_folder(base_dir):
+        group = "" if layout == "bundle" else intent_path.split("/")[0]
+        folder = intent_folder(intent_path, base_dir) if intent_path != "." else base_dir
+        files = groups.setdefault(group, {name: [] for name in BUNDLE_FILES})
+        for name in BUNDLE_FILES:
+            path = os.path.join(folder, name)
+            if os.path.isfile(path):
+                files[name].append(path)
+
+    outputs: Dict[str, str] = {}
+    for group, files in groups.items():
+        for name, bundle_name in BUNDLE_FILES.items():
+            if files[name]:
+                outputs[os.path.join(bundle_dir, group, bundle_name)] = render_bundle(files[name])
+    with os.scandir(base_dir) as it:
+        for e in it:
+            if e.is_file() and e.name.endswith((".yml", ".yaml")):
+                with open(e.path, "r", encoding="utf-8") as f:
+                    outputs[os.path.join(bundle_dir, e.name)] = f.read()
+
+    written = write_changed_files(outputs)
+
+    # Só remove o que o próprio gerador gravou antes (listado no manifesto do bundle)
+    wanted = {os.path.normpath(os.path.relpath(p, bundle_dir)) for p in outputs}
+    removed = 0
+    for rel in load_bundle_manifest(bundle_dir):
+        rel = os.path.normpath(rel)
+        if rel in wanted or os.path.isabs(rel) or rel.split(os.sep)[0] == os.pardir:
+            continue
+        path = os.path.join(bundle_dir, rel)
+        if os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+        parent = os.path.dirname(rel)
+        while parent and os.path.isdir(os.path.join(bundle_dir, parent)) and not os.listdir(os.path.join(bundle_dir, parent)):
+            os.rmdir(os.path.join(bundle_dir, parent))
+            parent = os.path.dirname(parent)
+    save_bundle_manifest(bundle_dir, list(wanted))
+
+    info(
+        f"📦 Layout '{layout}' em {bundle_dir}: {len(outputs)} arquivo(s), "
+        f"{written} gravado(s), {removed} obsoleto(s) removido(s)."
+    )
 
-def create_file_if_not_exists(path: str, default: Dict[str, Any]) -> None:
-    if not os.path.exists(path):
-        save_yaml(default, path)
-        info(f"Arquivo criado: {path}")
+
+# ==========================
+# Exportação JSON (--export-json)
+# ==========================
+#
+# O YAML de data/ continua sendo a versão editável; a exportação é um artefato de
+# build para treinar mais rápido (o leitor JSON do Rasa é bem mais barato que o YAML):
+#
+#   <dir>/data/nlu.json    -> rasa_nlu_data.common_examples de todas as intents
+#   <dir>/data/rules.yml, <dir>/data/stories.yml (cópias)
+#   <dir>/domain.yml       -> domain.yml + todas as responses utter_<intent>
+#
+# Uso: rasa train --data <dir>/data --domain <dir>/domain.yml (ou run_rasa.py --from-json)
+
+DEFAULT_EXPORT_DIR = os.path.join("build", "json")
+
+
+def examples_from_block(text: str) -> List[str]:
+    """Lista de exemplos de um bloco "- exemplo" do formato YAML do Rasa."""
+    return [line.strip()[2:].strip() for line in text.splitlines() if line.strip().startswith("- ")]
+
+
+def export_json_training_data(
+    entries: Dict[str, IntentEntry],
+    base_dir: str,
+    domain_path: str,
+    rules_path: str,
+    stories_path: str,
+    export_dir: str,
+) -> None:
+    """Exporta NLU (JSON) + snapshot do domínio direto da IR, regravando só o que mudou.
+
+    entries traz as intents do input (intent_path -> entrada já resolvida); intents que só
+    existem em data/ (ex.: nlu_fallback escrito à mão) são lidas dos próprios YAML.
+    """
+    common_examples: List[Dict[str, Any]] = []
+    responses: Dict[str, Any] = {}
+
+    for intent_path, (_, pt, en, response_array) in entries.items():
+        name, examples, cleaned = prepare_intent(intent_path, pt, en, response_array)
+        common_examples.extend({"text": ex, "intent": name, "entities": []} for ex in examples)
+        responses.setdefault(f"utter_{name}", response_variations(cleaned))
+
+    for intent_path in get_all_intents_in_data_folder(base_dir):
+        if intent_path in entries:
+            continue
+        folder = intent_folder(intent_path, base_dir)
+        _, questions = load_yaml_document(os.path.join(folder, "questions.yml"))
+        for item in questions.get("nlu") or []:
+            if "intent" in item:
+                common_examples.extend(
+                    {"text": ex, "intent": item["intent"], "entities": []}
+                    for ex in examples_from_block(str(item.get("examples") or ""))
+                )
+        _, extra = load_yaml_document(os.path.join(folder, "responses.yml"))
+        for key, value in (extra.get("responses") or {}).items():
+            responses.setdefault(key, value)
+
+    nlu = {
+        "rasa_nlu_data": {
+            "common_examples": common_examples,
+            "regex_features": [],
+            "lookup_tables": [],
+            "entity_synonyms": [],
+        }
+    }
+
+    _, domain = load_yaml_document(domain_path)
+    domain_responses = domain.get("responses") or {}
+    for key, value in responses.items():
+        if key not in domain_responses:
+            domain_responses[key] = value
+    domain["responses"] = domain_responses
+
+    outputs = {
+        os.path.join(export_dir, "data", "nlu.json"): json.dumps(nlu, ensure_ascii=False, indent=1) + "\n",
+        os.path.join(export_dir, "domain.yml"): dump_yaml_to_string(domain),
+    }
+    for path in (rules_path, stories_path):
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                outputs[os.path.join(export_dir, "data", os.path.basename(path))] = f.read()
+
+    written = write_changed_files(outputs)
+
+    info(
+        f"🗜️  Exportação JSON em {export_dir}: {len(common_examples)} exemplo(s), "
+        f"{len(domain_responses)} response(s); {written} arquivo(s) gravado(s)."
+    )
 
 
 # ==========================
 # main()
 # ==========================
 
+def generate_intents(
+    args: argparse.Namespace,
+    manifest: Dict[str, Dict[str, Any]],
+    previous_digests: Dict[str, str] | None = None,
+    entries: Dict[str, IntentEntry] | None = None,
+) -> Tuple[List[str], Dict[str, str], int]:
+    """Gera/atualiza em data/* só as intents que mudaram.
+
+    Sem previous_digests, a comparação é contra data/.manifest (hash + stamps dos arquivos);
+    com previous_digests (modo --watch), contra os hashes mantidos em memória.
+    Se entries for passado, recebe todas as intents resolvidas (para --export-json).
+    Devolve (intents alteradas, hash de todas as intents do input, quantidade inalterada).
+    """
+    changed: List[str] = []
+    tasks: List[WriteTask] = []
+    digests: Dict[str, str] = {}
+    unchanged = 0
+    prune = ExamplePruning(args.similarity) if args.near_dupes else None
+    intents = iter_input(
+        args.input_file, args.max_pt, args.max_en, args.max_both, args.use_cache, prune,
+        args.collision_policy, args.collision_key, args.collision_report, args.sampler,
+    )
+    # Intent repetida no input: a última ocorrência vence (como na escrita serial).
+    # O colapso vem antes da comparação com o manifest, e assim cada pasta
+    # é gravada por um único processo no --jobs
+    resolved: Dict[str, IntentEntry] = {}
+    for intent_path, pt, en, response_array in intents:
+        resolved.pop(intent_path, None)
+        resolved[intent_path] = (intent_path, pt, en, response_array)
+    if entries is not None:
+        entries.update(resolved)
+
+    for intent_path, pt, en, response_array in resolved.values():
+        digest = intent_digest(intent_path, pt, en, response_array)
+        digests[intent_path] = digest
+        if previous_digests is not None:
+            up_to_date = previous_digests.get(intent_path) == digest
+        else:
+            up_to_date = is_intent_up_to_date(manifest.get(intent_path), digest, intent_folder(intent_path, args.base_dir))
+        if up_to_date:
+            unchanged += 1
+            continue
+
+        changed.append(intent_path)
+        tasks.append((intent_path, pt, en, response_array, args.base_dir))
+
+    if prune is not None:
+        prune.finish()
+
+    if args.dry_run:
+        return changed, digests, unchanged
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    for (intent_path, pt, en, response_array, _), stamps in write_intents(tasks, jobs):
+        name = normalize_intent_name(intent_path)
+        info(
+            f"Criando intent '{name}' com {len(pt)} exemplo(s) PT, {len(en)} EN e {len(response_array)} resposta(s)"
+        )
+        manifest[intent_path] = {"hash": digests[intent_path], "files": stamps}
+
+    if changed:
+        save_manifest(manifest, args.base_dir)
+    return changed, digests, unchanged
+
+
+# ==========================
+# Modo --watch
+# ==========================
+
+def path_stamp(path: str) -> Tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def watch_input(
+    args: argparse.Namespace,
+    manifest: Dict[str, Dict[str, Any]],
+    digests: Dict[str, str],
+    project_paths: Tuple[str, str, str],
+) -> None:
+    """Fica observando o input (polling de mtime/tamanho) e regenera só o que mudou.
+
+    O estado (hash por intent) fica em memória entre as edições. domain/rules/stories só
+    são re-sincronizados quando surge intent nova ou quando algum deles foi alterado fora daqui.
+    """
+    domain_path, rules_path, stories_path = project_paths
+    input_stamp = path_stamp(args.input_file)
+    project_stamps = [path_stamp(p) for p in project_paths]
+    info(f"👀 Observando {args.input_file} a cada {args.poll_interval:.2f}s (Ctrl+C para sair)...")
+
+    try:
+        while True:
+            time.sleep(args.poll_interval)
+            stamp = path_stamp(args.input_file)
+            if stamp is None or stamp == input_stamp:
+                continue
+
+            # espera o editor terminar de gravar (mtime/tamanho estáveis)
+            while True:
+                time.sleep(min(args.poll_interval, 0.05))
+                settled = path_stamp(args.input_file)
+                if settled == stamp:
+                    break
+                stamp = settled
+            input_stamp = stamp
+
+            start = time.perf_counter()
+            try:
+                entries: Dict[str, IntentEntry] | None = {} if args.export_json else None
+                changed, new_digests, _ = generate_intents(args, manifest, digests, entries)
+                new_intents = set(new_digests) - set(digests)
+                digests = new_digests
+                if new_intents or [path_stamp(p) for p in project_paths] != project_stamps:
+                    sync_domain_rules_stories(args.base_dir, domain_path, rules_path, stories_path)
+                    project_stamps = [path_stamp(p) for p in project_paths]
+                if args.layout != "intent":
+                    write_layout_bundles(args.base_dir, args.bundle_dir, args.layout)
+                if entries is not None:
+                    export_json_training_data(entries, args.base_dir, domain_path, rules_path, stories_path, args.export_json)
+            except CollisionError as e:
+                error(f"{e} (--collision-policy fail). Corrija o input; o watch continua.")
+                continue
+            except Exception as e:  # o daemon não pode morrer por causa de uma edição ruim
+                error(f"Falha ao regenerar a partir de {args.input_file}: {e}")
+                continue
+
+            elapsed = time.perf_counter() - start
+            success(f"🔁 {len(changed)} intent(s) regeneradas em {elapsed:.3f}s: {', '.join(changed) or '-'}")
+    except KeyboardInterrupt:
+        info("Watch encerrado.")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Gera intents a partir de input.txt com respostas e exemplos PT/EN e sincroniza domain/rules/stories.",
@@ -642,49 +1358,103 @@ def main() -> None:
     parser.add_argument("--max-en", dest="max_en", type=int, default=None, help="Limite global apenas EN")
     parser.add_argument("--base-dir", dest="base_dir", default=DEFAULT_BASE_DIR, help="Diretório base das intents (default: data)")
     parser.add_argument("--domain", dest="domain_path", default=DEFAULT_DOMAIN_PATH, help="Caminho para domain.yml (default: domain.yml)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", help="Ignora o cache da IR do input (.cache/input_ir) e re-parseia o arquivo")
+    parser.add_argument("--force", action="store_true", help="Ignora data/.manifest e regrava todas as intents")
+    parser.add_argument("--dry-run", dest="dry_run", action="store_true", help="Só relata quais intents seriam (re)escritas, sem gravar nada")
+    parser.add_argument("--jobs", type=int, default=1, help="Processos para gravar as intents em paralelo (0 = nº de CPUs; default: 1)")
+    parser.add_argument("--emitter", choices=sorted(EMITTERS), default=DEFAULT_EMITTER, help=f"Backend de emissão do YAML das intents (default: {DEFAULT_EMITTER})")
+    parser.add_argument("--changed", action="store_true", help="Ao final, lista (uma por linha) as intents (re)escritas ou que seriam (re)escritas")
+    parser.add_argument("--watch", action="store_true", help="Após gerar, continua observando o input e regenera só as intents editadas")
+    parser.add_argument("--poll-interval", dest="poll_interval", type=float, default=0.25, help="Intervalo de polling do --watch em segundos (default: 0.25)")
+    parser.add_argument("--near-dupes", dest="near_dupes", action="store_true", help="Poda exemplos repetidos após normalização e quase-duplicatas (MinHash/LSH) dentro de cada intent")
+    parser.add_argument("--similarity", type=float, default=DEFAULT_SIMILARITY, help=f"Similaridade (Jaccard de trigramas) a partir da qual --near-dupes descarta um exemplo (default: {DEFAULT_SIMILARITY})")
+    parser.add_argument("--collision-policy", dest="collision_policy", choices=COLLISION_POLICIES, default=DEFAULT_COLLISION_POLICY, help=f"O que fazer com exemplo repetido em intents diferentes (default: {DEFAULT_COLLISION_POLICY})")
+    parser.add_argument("--collision-key", dest="collision_key", choices=sorted(COLLISION_KEYS), default="exact", help="Como comparar exemplos entre intents: texto exato ou forma normalizada (default: exact)")
+    parser.add_argument("--collision-report", dest="collision_report", default=None, help="Grava o relatório completo de colisões em JSON neste caminho")
+    parser.add_argument("--layout", choices=LAYOUTS, default=DEFAULT_LAYOUT, help="intent: só data/<categoria>/<intent>/*.yml; category/bundle: também um nlu.yml + responses.yml por categoria ou um par único em --bundle-dir (default: intent)")
+    parser.add_argument("--bundle-dir", dest="bundle_dir", default=DEFAULT_BUNDLE_DIR, help=f"Destino dos layouts category/bundle, pronto para `rasa train --data` (default: {DEFAULT_BUNDLE_DIR})")
+    parser.add_argument("--export-json", dest="export_json", nargs="?", const=DEFAULT_EXPORT_DIR, default=None, help=f"Também exporta o NLU em JSON do Rasa + snapshot do domain para treino rápido (default do diretório: {DEFAULT_EXPORT_DIR})")
+    parser.add_argument("--sample", choices=SAMPLERS, default=DEFAULT_SAMPLER, help="Quais exemplos ficam quando --max/#max corta a lista: os primeiros (head) ou os mais diversos (diverse, precisa do NumPy) (default: head)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"Semente da amostragem diverse (default: {DEFAULT_SEED})")
+    parser.add_argument("--install-deps", dest="install_deps", action="store_true", help="Verifica/instala as dependências via pip mesmo que já tenham sido verificadas neste ambiente")
     args = parser.parse_args()
 
-    input_file = args.input_file
+    if args.watch and args.dry_run:
+        parser.error("--watch não pode ser combinado com --dry-run")
+
+    if not 0.0 < args.similarity <= 1.0:
+        parser.error("--similarity deve estar no intervalo (0, 1]")
+
+    if args.seed < 0:
+        parser.error("--seed deve ser >= 0")
+
+    if args.layout != "intent":
+        protected = bundle_dir_conflict(args.bundle_dir, [args.base_dir, os.path.dirname(os.path.abspath(args.domain_path)), os.getcwd()])
+        if protected is not None:
+            parser.error(f"--bundle-dir {args.bundle_dir} não pode ser (nem conter) {protected}: a pasta do layout é regravada pelo gerador")
+
+    ensure_packages(REQUIRED_PACKAGES, force=args.install_deps)
+
+    try:
+        args.sampler = make_sampler(args.sample, args.seed)
+    except ImportError as e:
+        parser.error(str(e))
+
+    set_emitter(args.emitter)
     base_dir = args.base_dir
     domain_path = args.domain_path
     rules_path = os.path.join(base_dir, "rules.yml")
     stories_path = os.path.join(base_dir, "stories.yml")
 
-    os.makedirs(base_dir, exist_ok=True)
-    create_file_if_not_exists(
-        domain_path,
-        {
-            "version": RASA_VERSION,
-            "intents": [],
-            "actions": [],
-            "session_config": {
-                "session_expiration_time": 60,
-                "carry_over_slots_to_new_session": True,
-            },
-        },
-    )
-    create_file_if_not_exists(rules_path, {"version": RASA_VERSION, "rules": []})
-    create_file_if_not_exists(stories_path, {"version": RASA_VERSION, "stories": []})
+    if not args.dry_run:
+        os.makedirs(base_dir, exist_ok=True)
 
-    # 1) Gera intents/respostas a partir do input (cria/atualiza arquivos em data/*)
-    intents = parse_input(input_file, args.max_pt, args.max_en, args.max_both)
-    for intent_path, pt, en, response_array in intents:
-        name = normalize_intent_name(intent_path)
-        info(
-            f"Criando intent '{name}' com {len(pt)} exemplo(s) PT, {len(en)} EN e {len(response_array)} resposta(s)"
-        )
-        create_files(intent_path, pt, en, response_array, base_dir)
+    # 1) Gera intents/respostas a partir do input (cria/atualiza só o que mudou em data/*)
+    manifest = {} if args.force else load_manifest(base_dir)
+    entries: Dict[str, IntentEntry] | None = {} if args.export_json else None
+    try:
+        changed, digests, unchanged = generate_intents(args, manifest, entries=entries)
+    except FileNotFoundError as e:
+        error(str(e))
+        sys.exit(1)
+    except CollisionError as e:
+        error(f"{e} (--collision-policy fail). Corrija o input ou use first-wins/drop-all.")
+        sys.exit(1)
+
+    if args.dry_run:
+        info(f"[dry-run] {len(changed)} intent(s) seriam (re)escritas, {unchanged} inalterada(s).")
+        for intent_path in changed:
+            print(f"  - {intent_path}")
+    else:
+        info(f"{len(changed)} intent(s) (re)escritas, {unchanged} inalterada(s) (puladas via {MANIFEST_FILENAME}).")
 
-    # 2) Depois de gerar os arquivos, sincroniza domain/rules/stories sem duplicar
-    ensure_all_data_intents_registered(base_dir, domain_path, rules_path, stories_path)
+    if args.changed:
+        for intent_path in changed:
+            print(intent_path)
 
-    # 3) Por último, append da rule/story de fallback no fim dos arquivos (sem duplicar)
-    append_fallback_rule_and_story(rules_path, stories_path)
+    if args.dry_run:
+        return
+
+    # 2) Depois de gerar os arquivos, sincroniza domain/rules/stories + fallback rule/story
+    #    numa única transação (cada arquivo lido e gravado no máximo uma vez)
+    sync_domain_rules_stories(base_dir, domain_path, rules_path, stories_path)
+
+    # 3) Layout consolidado (opcional), derivado de data/ já sincronizado
+    if args.layout != "intent":
+        write_layout_bundles(base_dir, args.bundle_dir, args.layout)
+
+    # 4) Exportação JSON (opcional) para treino rápido, direto da IR
+    if entries is not None:
+        export_json_training_data(entries, base_dir, domain_path, rules_path, stories_path, args.export_json)
 
     success(
         "Finalizado: exemplos preservados, intents sincronizadas sem duplicar, e fallback rule/story + action_fallback garantidos!",
     )
 
+    # 5) Modo daemon: mantém o estado em memória e regenera a cada edição do input
+    if args.watch:
+        watch_input(args, manifest, digests, (domain_path, rules_path, stories_path))
+
 
 if __name__ == "__main__":
     main()
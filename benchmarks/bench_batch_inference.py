@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da inferência em lote do modo in-process
+(test_intents_from_input --in-process MODELO --batch-size N).
+
+Carrega o modelo uma vez, faz o parse dos mesmos exemplos com lote 1
+(Agent.parse_message, a referência) e com cada tamanho de lote pedido (grafo NLU
+uma vez por lote) e mede exemplos/s. Confere também que intent e confiança
+batem com o parse individual (diferença máxima de confiança).
+
+Precisa do Rasa instalado (ative o venv_rasa) e de um modelo treinado.
+
+Exemplo de uso:
+
+python benchmarks/bench_batch_inference.py --model models/ --max-tests 2000 --batch-sizes 16 64 256
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import test_intents_from_input as harness  # noqa: E402
+
+
+async def parse_all(agent, texts, batch_size: int):
+    if batch_size <= 1:
+        return [await harness.call_agent_parse(agent, text) for text in texts]
+    results = []
+    for start in range(0, len(texts), batch_size):
+        results.extend(await harness.call_agent_parse_batch(agent, texts[start:start + batch_size]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput do parse in-process por tamanho de lote")
+    parser.add_argument("--model", default="models", help="Modelo .tar.gz ou pasta (usa o mais recente)")
+    parser.add_argument("--input-file", default="input.txt")
+    parser.add_argument("--max-tests", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 128, 256])
+    args = parser.parse_args()
+
+    try:
+        agent = harness.load_rasa_agent(harness.resolve_model_path(args.model))
+    except (ImportError, FileNotFoundError, RuntimeError) as e:
+        print(f"⚠️ {e}")
+        sys.exit(1)
+
+    texts = [case["text"] for case in harness.parse_input_examples(args.input_file, None, None, None)]
+    texts = texts[:args.max_tests]
+    print(f"📄 {len(texts)} exemplos")
+
+    # aquece o grafo (primeira chamada do TensorFlow compila/aloca)
+    asyncio.run(parse_all(agent, texts[:8], 1))
+
+    start = time.perf_counter()
+    reference = asyncio.run(parse_all(agent, texts, 1))
+    base = time.perf_counter() - start
+    print(f"  • lote   1  {base:7.2f}s  {len(texts) / base:8.1f} exemplos/s")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        results = asyncio.run(parse_all(agent, texts, batch_size))
+        elapsed = time.perf_counter() - start
+        mismatches = sum(1 for r, b in zip(reference, results) if r[0] != b[0])
+        max_delta = max(abs(r[1] - b[1]) for r, b in zip(reference, results))
+        print(
+            f"  • lote {batch_size:3d}  {elapsed:7.2f}s  {len(texts) / elapsed:8.1f} exemplos/s  "
+            f"({base / elapsed:5.2f}x)  intents diferentes={mismatches}  máx |Δconf|={max_delta:.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
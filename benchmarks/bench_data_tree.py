@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da descoberta de intents em data/ (get_all_intents_in_data_folder).
+
+Monta uma árvore sintética (por padrão 100 categorias x 100 intents, cada uma
+com questions.yml + responses.yml) num diretório temporário e compara:
+
+- a varredura antiga (os.listdir + os.path.isdir por entrada);
+- a varredura com os.scandir sem manifesto (fria);
+- a varredura com os.scandir reaproveitando o manifesto de .cache/data_tree (quente);
+- a varredura quente depois de criar uma intent nova numa categoria.
+
+Confere também que todas devolvem exatamente a mesma lista.
+
+Exemplo de uso:
+
+python benchmarks/bench_data_tree.py --categories 100 --intents 100 --rounds 5
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import automation_intents as ai  # noqa: E402
+
+
+def listdir_walk(base_dir: str):
+    """Implementação anterior, mantida aqui como referência."""
+    intents = []
+
+    def recurse(path: str) -> None:
+        for e in sorted(os.listdir(path)):
+            full = os.path.join(path, e)
+            if os.path.isdir(full):
+                recurse(full)
+            elif e == "questions.yml":
+                intents.append(os.path.relpath(path, base_dir).replace("\\", "/"))
+
+    recurse(base_dir)
+    return intents
+
+
+def build_tree(base_dir: str, categories: int, intents: int) -> None:
+    for c in range(categories):
+        for i in range(intents):
+            folder = os.path.join(base_dir, f"category_{c:03d}", f"intent_{i:03d}")
+            os.makedirs(folder)
+            for filename in ("questions.yml", "responses.yml"):
+                with open(os.path.join(folder, filename), "w", encoding="utf-8") as f:
+                    f.write("version: '3.1'\n")
+
+
+def age_tree(base_dir: str) -> None:
+    """Recua os mtimes dos diretórios para fora da janela "racy" do manifesto."""
+    past = time.time() - 60
+    for root, dirs, _ in os.walk(base_dir):
+        for d in dirs:
+            os.utime(os.path.join(root, d), (past, past))
+    os.utime(base_dir, (past, past))
+
+
+def best_of(rounds: int, fn):
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de get_all_intents_in_data_folder")
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--intents", type=int, default=100, help="Intents por categoria")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp_root = tempfile.mkdtemp(prefix="bench_data_tree_")
+    cwd = os.getcwd()
+    try:
+        # o manifesto vai para .cache/ relativo ao cwd: isola no diretório temporário
+        os.chdir(tmp_root)
+        base_dir = os.path.join(tmp_root, "data")
+        build_tree(base_dir, args.categories, args.intents)
+        age_tree(base_dir)
+        total = args.categories * args.intents
+        print(f"🌳 árvore sintética: {total} intents em {args.categories} categorias")
+
+        t_old, reference = best_of(args.rounds, lambda: listdir_walk(base_dir))
+        t_cold, cold = best_of(args.rounds, lambda: ai.get_all_intents_in_data_folder(base_dir, use_cache=False))
+        ai.get_all_intents_in_data_folder(base_dir)  # grava o manifesto
+        t_warm, warm = best_of(args.rounds, lambda: ai.get_all_intents_in_data_folder(base_dir))
+
+        new_folder = os.path.join(base_dir, "category_000", "intent_new")
+        os.makedirs(new_folder)
+        open(os.path.join(new_folder, "questions.yml"), "w").close()
+        start = time.perf_counter()
+        changed = ai.get_all_intents_in_data_folder(base_dir)
+        t_changed = time.perf_counter() - start
+
+        print(f"  • listdir + isdir     : {t_old:7.3f}s")
+        print(f"  • scandir (frio)      : {t_cold:7.3f}s  ({t_old / t_cold:5.2f}x)")
+        print(f"  • scandir + manifesto : {t_warm:7.3f}s  ({t_old / t_warm:5.2f}x)")
+        print(f"  • após 1 intent nova  : {t_changed:7.3f}s")
+        same = reference == cold == warm and changed == listdir_walk(base_dir)
+        print(f"  • resultados idênticos: {'sim' if same else 'NÃO!'}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Microbenchmark dos emissores de YAML de questions.yml / responses.yml.
+
+Renderiza (em memória, sem I/O) todas as intents do input com cada backend
+de automation_intents.EMITTERS, mede o tempo e confere que o texto gerado
+é idêntico ao do ruamel.
+
+Exemplo de uso:
+
+python benchmarks/bench_emitters.py --input-file input.txt --rounds 5
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import automation_intents as ai  # noqa: E402
+
+
+def build_documents(input_file: str):
+    """Prepara (nome, exemplos, respostas) exatamente como create_files faz."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        intents = ai.parse_input(input_file, None, None, None)
+
+    documents = []
+    for intent_path, pt, en, response_array in intents:
+        name = ai.normalize_intent_name(intent_path)
+        examples = "".join(f"- {ex}\n" for ex in pt + en).rstrip("\n") + "\n"
+        responses = [(ai.clean_multiline_response(a), ai.clean_multiline_response(b)) for a, b in response_array]
+        documents.append((name, examples, responses))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark dos emissores de YAML")
+    parser.add_argument("--input-file", default="input.txt")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = build_documents(args.input_file)
+    reference = [ai.render_intent_files(*doc, emitter="ruamel") for doc in documents]
+
+    timings = {}
+    for emitter in sorted(ai.EMITTERS):
+        best = float("inf")
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            rendered = [ai.render_intent_files(*doc, emitter=emitter) for doc in documents]
+            best = min(best, time.perf_counter() - start)
+        timings[emitter] = best
+        same = "idêntico" if rendered == reference else "DIFERENTE!"
+        print(f"  • {emitter:7s} {len(documents)} intents  melhor de {args.rounds}: {best * 1000:8.2f} ms  saída={same}")
+
+    if "fast" in timings and "ruamel" in timings:
+        print(f"⚡ fast é {timings['ruamel'] / timings['fast']:.1f}x mais rápido que ruamel")
+
+
+if __name__ == "__main__":
+    main()
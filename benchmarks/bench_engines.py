@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark dos engines de avaliação do test_intents_from_input (--engine thread|async).
+
+Roda os mesmos exemplos (input.txt rotulado) pelos dois engines contra o mesmo
+backend e mede throughput (exemplos/s). Sem --rasa-url, sobe um /model/parse
+falso (aiohttp.web, numa thread) que responde após --delay segundos, simulando
+a latência do Rasa; com --rasa-url, usa o servidor indicado.
+
+Confere também que stats e registros saem idênticos nos dois engines.
+
+Exemplo de uso:
+
+python benchmarks/bench_engines.py --max-tests 3000 --delay 0.02 --workers 4 8 --concurrency 50 200
+python benchmarks/bench_engines.py --rasa-url http://localhost:5005/model/parse
+"""
+
+import io
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import test_intents_from_input as harness  # noqa: E402
+
+
+def start_fake_rasa(delay: float) -> str:
+    """Sobe um /model/parse falso numa thread e devolve a URL."""
+    from aiohttp import web
+
+    async def parse(request):
+        payload = await request.json()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        text = payload.get("text", "")
+        return web.json_response({
+            "text": text,
+            "intent": {"name": f"fake_{len(text) % 7}", "confidence": 0.9},
+        })
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_post("/model/parse", parse)
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return f"http://127.0.0.1:{port}/model/parse"
+
+
+def run(cases, rasa_url: str, engine: str, workers: int, concurrency: int):
+    harness.configure_http_session(workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats, records = harness.run_tests(
+            cases, rasa_url, progress_every=0, workers=workers, engine=engine, concurrency=concurrency
+        )
+    elapsed = time.perf_counter() - start
+    key = (
+        {k: dict(v) for k, v in stats.items()},
+        sorted((r.lang, r.text, r.expected, r.predicted, r.confidence) for r in records),
+    )
+    return elapsed, key
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de --engine thread|async")
+    parser.add_argument("--input-file", default="input.txt")
+    parser.add_argument("--rasa-url", default=None, help="Servidor real; sem isto sobe um /model/parse falso")
+    parser.add_argument("--delay", type=float, default=0.02, help="Latência do servidor falso (s)")
+    parser.add_argument("--max-tests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 100])
+    args = parser.parse_args()
+
+    cases = harness.parse_input_examples(args.input_file, None, None, None)[:args.max_tests]
+    rasa_url = args.rasa_url or start_fake_rasa(args.delay)
+    backend = args.rasa_url or f"servidor falso (delay={args.delay * 1000:.0f}ms)"
+    print(f"📄 {len(cases)} exemplos contra {backend}")
+
+    reference = None
+    runs = [("thread", w, w) for w in args.workers] + [("async", 1, c) for c in args.concurrency]
+    for engine, workers, concurrency in runs:
+        elapsed, key = run(cases, rasa_url, engine, workers, concurrency)
+        if reference is None:
+            reference = key
+        label = f"workers={workers}" if engine == "thread" else f"concurrency={concurrency}"
+        print(
+            f"  • {engine:6s} {label:16s}  {elapsed:6.2f}s  {len(cases) / elapsed:8.1f} exemplos/s  "
+            f"resultados iguais: {'sim' if key == reference else 'NÃO!'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da poda de quase-duplicatas (automation_intents --near-dupes).
+
+Para cada similaridade pedida, mede:
+- exemplos antes/depois da poda (e quantos caíram em cada etapa);
+- tempo da poda a frio (sem .cache/near_dupes.pkl);
+- tamanho estimado dos vocabulários do config.yml: palavras e char_wb 3..5
+  (ambos com min_df=2), que dimensionam as features do DIET.
+
+Com --train (precisa do Rasa instalado), gera os dados com e sem poda em
+diretórios temporários e cronometra `rasa train nlu` para cada variante.
+
+Exemplo de uso:
+
+python benchmarks/bench_near_dupes.py --input-file input.txt --similarity 0.9 0.8 0.7
+python benchmarks/bench_near_dupes.py --similarity 0.8 --train
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import automation_intents as ai  # noqa: E402
+from dedupe import NearDuplicatePruner  # noqa: E402
+
+CHAR_NGRAMS = (3, 5)
+MIN_DF = 2
+
+
+def load_examples(input_file: str, pruner=None):
+    """Exemplos (PT+EN) de todas as intents, opcionalmente podados."""
+    prune = (lambda examples: pruner.prune(examples).kept) if pruner is not None else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        intents = list(ai.iter_input(input_file, None, None, None, prune=prune))
+    return [example for _, pt, en, _ in intents for example in pt + en]
+
+
+def vocabulary_sizes(examples):
+    """Estimativa dos vocabulários word / char_wb (min_df=2) do CountVectorsFeaturizer."""
+    words = Counter()
+    chars = Counter()
+    low, high = CHAR_NGRAMS
+    for example in examples:
+        tokens = example.lower().split()
+        words.update(set(tokens))
+        grams = set()
+        for token in tokens:
+            padded = f" {token} "
+            for n in range(low, high + 1):
+                grams.update(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+        chars.update(grams)
+    return (
+        sum(1 for c in words.values() if c >= MIN_DF),
+        sum(1 for c in chars.values() if c >= MIN_DF),
+    )
+
+
+def train_nlu(input_file: str, similarity, tmp_root: str) -> float:
+    """Gera data/* (com ou sem poda) num diretório temporário e cronometra `rasa train nlu`."""
+    label = "sem_poda" if similarity is None else f"poda_{similarity}"
+    work = os.path.join(tmp_root, label)
+    os.makedirs(work)
+    cmd = [sys.executable, os.path.join(ROOT, "automation_intents.py"), os.path.abspath(input_file),
+           "--base-dir", os.path.join(work, "data"), "--domain", os.path.join(work, "domain.yml"), "--no-cache"]
+    if similarity is not None:
+        cmd += ["--near-dupes", "--similarity", str(similarity)]
+    subprocess.run(cmd, cwd=work, stdout=subprocess.DEVNULL, check=True)
+
+    start = time.perf_counter()
+    subprocess.run(
+        ["rasa", "train", "nlu", "--nlu", os.path.join(work, "data"), "--config", os.path.join(ROOT, "config.yml"),
+         "--out", os.path.join(work, "models")],
+        cwd=work,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de automation_intents --near-dupes")
+    parser.add_argument("--input-file", default="input.txt")
+    parser.add_argument("--similarity", type=float, nargs="+", default=[0.9, 0.8, 0.7])
+    parser.add_argument("--train", action="store_true", help="Também cronometra `rasa train nlu` com e sem poda")
+    args = parser.parse_args()
+
+    baseline = load_examples(args.input_file)
+    words, chars = vocabulary_sizes(baseline)
+    print(f"📄 sem poda: {len(baseline)} exemplos | vocab word={words} char_wb={chars}")
+
+    for similarity in args.similarity:
+        pruner = NearDuplicatePruner(similarity)
+        start = time.perf_counter()
+        examples = load_examples(args.input_file, pruner)
+        elapsed = time.perf_counter() - start
+        words_p, chars_p = vocabulary_sizes(examples)
+        print(
+            f"  • similaridade={similarity:.2f}  exemplos={len(examples)} "
+            f"(-{100.0 * (len(baseline) - len(examples)) / len(baseline):.1f}%)  "
+            f"vocab word={words_p} char_wb={chars_p}  poda={elapsed:.2f}s"
+        )
+
+    if not args.train:
+        return
+    if shutil.which("rasa") is None:
+        print("⚠️ Rasa não encontrado no PATH; pulando a medição de `rasa train nlu`.")
+        return
+
+    tmp_root = tempfile.mkdtemp(prefix="bench_near_dupes_")
+    try:
+        base_time = train_nlu(args.input_file, None, tmp_root)
+        print(f"🏋️  rasa train nlu sem poda: {base_time:.1f}s")
+        for similarity in args.similarity:
+            elapsed = train_nlu(args.input_file, similarity, tmp_root)
+            print(f"  • similaridade={similarity:.2f}: {elapsed:.1f}s ({base_time / elapsed:.2f}x)")
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da gravação de intents em paralelo (automation_intents --jobs N).
+
+Gera todas as intents do input em diretórios temporários com 1, 2, 4, ...
+processos (até o nº de CPUs), mede o tempo de cada execução e confere que
+as árvores geradas são byte a byte idênticas à execução serial.
+
+Exemplo de uso:
+
+python benchmarks/bench_parallel_generation.py --input-file input.txt --repeat 5
+"""
+
+import os
+import sys
+import time
+import shutil
+import filecmp
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import automation_intents as ai  # noqa: E402
+
+
+def build_tasks(input_file: str, repeat: int, base_dir: str):
+    """Replica as intents do input `repeat` vezes (com prefixo) para simular um corpus maior."""
+    intents = ai.parse_input(input_file, None, None, None)
+    tasks = []
+    for r in range(repeat):
+        for intent_path, pt, en, responses in intents:
+            tasks.append((f"copy{r:02d}/{intent_path}", pt, en, responses, base_dir))
+    return tasks
+
+
+def trees_equal(a: str, b: str) -> bool:
+    cmp = filecmp.dircmp(a, b)
+    if cmp.left_only or cmp.right_only or cmp.funny_files:
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(a, b, cmp.common_files, shallow=False)
+    if mismatch or errors:
+        return False
+    return all(trees_equal(os.path.join(a, d), os.path.join(b, d)) for d in cmp.common_dirs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de automation_intents --jobs N")
+    parser.add_argument("--input-file", default="input.txt")
+    parser.add_argument("--repeat", type=int, default=3, help="Quantas cópias do corpus gerar (default: 3)")
+    parser.add_argument("--jobs", type=int, nargs="+", default=None, help="Valores de jobs a medir (default: 1, 2, 4, ... até o nº de CPUs)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    job_counts = sorted({1, *(args.jobs or [n for n in (2, 4, 8, 16, 32) if n <= cpus] + [cpus])})
+
+    tmp_root = tempfile.mkdtemp(prefix="bench_jobs_")
+    try:
+        reference = None
+        baseline = None
+        print(f"🖥️  CPUs: {cpus}")
+        for jobs in job_counts:
+            base_dir = os.path.join(tmp_root, f"jobs_{jobs}")
+            tasks = build_tasks(args.input_file, args.repeat, base_dir)
+            start = time.perf_counter()
+            for _ in ai.write_intents(tasks, jobs):
+                pass
+            elapsed = time.perf_counter() - start
+
+            if reference is None:
+                reference, baseline = base_dir, elapsed
+                identical = "referência"
+            else:
+                identical = "idêntico" if trees_equal(reference, base_dir) else "DIFERENTE!"
+            print(
+                f"  • jobs={jobs:2d}  intents={len(tasks):5d}  tempo={elapsed:7.3f}s  "
+                f"speedup={baseline / elapsed:5.2f}x  saída={identical}"
+            )
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do carregamento dos dados de treino em cada layout
+(automation_intents --layout intent|category|bundle).
+
+Monta os layouts category e bundle a partir de data/ em diretórios temporários
+e, para cada layout (intent = o próprio data/), mede:
+
+- quantos .yml existem e o tempo para abrir + parsear todos com ruamel (sempre);
+- com o Rasa instalado, o tempo do TrainingDataImporter para carregar NLU,
+  stories/rules e domínio (o que `rasa train` / `rasa data validate` fazem antes
+  de treinar), cada medição num processo novo para não reaproveitar caches.
+
+Exemplo de uso:
+
+python benchmarks/bench_rasa_loading.py --rounds 3
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import automation_intents as ai  # noqa: E402
+
+RASA_LOAD_SNIPPET = """
+import sys, time
+from rasa.shared.importers.importer import TrainingDataImporter
+start = time.perf_counter()
+importer = TrainingDataImporter.load_from_config(sys.argv[1], sys.argv[2], [sys.argv[3]])
+importer.get_nlu_data()
+importer.get_stories()
+importer.get_domain()
+print(time.perf_counter() - start)
+"""
+
+
+def yaml_files(data_dir: str):
+    return sorted(
+        os.path.join(root, f)
+        for root, _, files in os.walk(data_dir)
+        for f in files
+        if f.endswith((".yml", ".yaml"))
+    )
+
+
+def ruamel_parse_time(data_dir: str, rounds: int) -> float:
+    files = yaml_files(data_dir)
+    yaml = ai.get_yaml()
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for path in files:
+            with open(path, "r", encoding="utf-8") as f:
+                yaml.load(f)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def rasa_load_time(data_dir: str, config: str, domain: str, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        proc = subprocess.run(
+            [sys.executable, "-c", RASA_LOAD_SNIPPET, config, domain, data_dir],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        best = min(best, float(proc.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def rasa_available() -> bool:
+    proc = subprocess.run([sys.executable, "-c", "import rasa"], capture_output=True)
+    return proc.returncode == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de carregamento dos dados de treino por layout")
+    parser.add_argument("--base-dir", default=os.path.join(ROOT, "data"))
+    parser.add_argument("--config", default=os.path.join(ROOT, "config.yml"))
+    parser.add_argument("--domain", default=os.path.join(ROOT, "domain.yml"))
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with_rasa = rasa_available()
+    if not with_rasa:
+        print("⚠️ Rasa não instalado neste Python: medindo só o parse com ruamel.")
+
+    tmp_root = tempfile.mkdtemp(prefix="bench_layouts_")
+    try:
+        layouts = {"intent": args.base_dir}
+        for layout in ("category", "bundle"):
+            bundle_dir = os.path.join(tmp_root, layout)
+            with contextlib.redirect_stdout(io.StringIO()):
+                ai.write_layout_bundles(args.base_dir, bundle_dir, layout)
+            layouts[layout] = bundle_dir
+
+        for layout, data_dir in layouts.items():
+            line = (
+                f"  • {layout:8s}  arquivos={len(yaml_files(data_dir)):4d}  "
+                f"ruamel={ruamel_parse_time(data_dir, args.rounds):6.3f}s"
+            )
+            if with_rasa:
+                line += f"  rasa={rasa_load_time(data_dir, args.config, args.domain, args.rounds):6.3f}s"
+            print(line)
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
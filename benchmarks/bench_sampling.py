@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da amostragem de exemplos (--sample head|diverse).
+
+Para cada fração do corpus (ex.: 30% e 50% dos exemplos de cada intent/idioma),
+compara o corte "head" com o k-center "diverse" medindo a cobertura: para cada
+exemplo descartado, a distância (1 - cosseno de n-gramas de caracteres) até o
+exemplo mantido mais próximo. Quanto menores a média e o pior caso, melhor a
+amostra representa a intent. Mede também o tempo da amostragem.
+
+A perda de acurácia de verdade só dá para medir treinando o Rasa; isto é a
+métrica de geometria que o k-center otimiza.
+
+Exemplo de uso:
+
+python benchmarks/bench_sampling.py --input-file input.txt --fractions 0.3 0.5
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from input_parser import LANGUAGES, iter_intents, load_input  # noqa: E402
+from sampling import char_ngram_matrix, diverse_sample, require_numpy  # noqa: E402
+
+
+def coverage(examples, kept):
+    """(média, máximo) da distância de cada exemplo descartado ao mantido mais próximo."""
+    kept_set = set(kept)
+    dropped = [e for e in examples if e not in kept_set]
+    if not dropped or not kept:
+        return 0.0, 0.0
+    vectors = char_ngram_matrix(dropped + list(kept))
+    distances = 1.0 - vectors[:len(dropped)] @ vectors[len(dropped):].T
+    nearest = distances.min(axis=1)
+    return float(nearest.mean()), float(nearest.max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de --sample head|diverse")
+    parser.add_argument("--input-file", default="input.txt")
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.3, 0.5])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    try:
+        require_numpy()
+    except ImportError as e:
+        parser.error(str(e))
+
+    parsed = load_input(args.input_file)
+    groups = [
+        examples
+        for _, pt, en, _ in iter_intents(parsed, None, None, None)
+        for examples in (pt, en)
+        if len(examples) > 1
+    ]
+    total = sum(len(g) for g in groups)
+    print(f"📄 {total} exemplos em {len(groups)} listas (intent x {'/'.join(LANGUAGES)})")
+
+    for fraction in args.fractions:
+        for method in ("head", "diverse"):
+            start = time.perf_counter()
+            samples = []
+            for examples in groups:
+                n = max(1, round(len(examples) * fraction))
+                kept = examples[:n] if method == "head" else diverse_sample(examples, n, args.seed)
+                samples.append((examples, kept))
+            elapsed = time.perf_counter() - start
+
+            scores = [coverage(examples, kept) for examples, kept in samples]
+            kept_total = sum(len(kept) for _, kept in samples)
+            mean = sum(m for m, _ in scores) / len(scores)
+            worst = sum(w for _, w in scores) / len(scores)
+            print(
+                f"  • {fraction:.0%} {method:7s}  exemplos={kept_total:6d}  "
+                f"dist. média ao mantido={mean:.3f}  pior caso médio={worst:.3f}  tempo={elapsed:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
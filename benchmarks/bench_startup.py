@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de startup dos CLIs (automation_intents.py e test_intents_from_input.py).
+
+Para cada script:
+- roda `python -X importtime -c "import <módulo>"` e soma o tempo de import
+  do próprio módulo e das dependências carregadas por ele;
+- falha (exit 1) se algum módulo pesado (ruamel, requests, multiprocessing...)
+  for carregado só por importar o script — eles devem ser importados sob demanda;
+- mede o wall time de `python <script> --help` (melhor de N rodadas).
+
+Serve como guarda contra regressões de import eager.
+
+Exemplo de uso:
+
+python benchmarks/bench_startup.py --rounds 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = {
+    "automation_intents": ("ruamel", "concurrent.futures.process", "multiprocessing"),
+    "test_intents_from_input": ("requests", "urllib3", "concurrent.futures.thread"),
+}
+
+
+def import_profile(module: str):
+    """Devolve {módulo: tempo cumulativo em µs} do `-X importtime` ao importar `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # pula os módulos já carregados pelo próprio interpretador (site etc.)
+    baseline = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "pass"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    preloaded = {line.split("|")[-1].strip() for line in baseline.stderr.splitlines() if line.startswith("import time:")}
+
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name not in preloaded:
+            profile[name] = int(cumulative.strip())
+    return profile
+
+
+def help_wall_time(script: str, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, f"{script}.py", "--help"],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark/guarda de tempo de import dos CLIs")
+    parser.add_argument("--rounds", type=int, default=3, help="Rodadas de `--help` por script (default: 3)")
+    args = parser.parse_args()
+
+    ok = True
+    for module, forbidden in SCRIPTS.items():
+        profile = import_profile(module)
+        total_ms = profile.get(module, 0) / 1000
+        heavy = sorted(name for name in profile if name.split(".")[0] in forbidden or name in forbidden)
+        wall = help_wall_time(module, args.rounds)
+
+        print(f"{module}: import {total_ms:.1f} ms | --help {wall * 1000:.1f} ms (melhor de {args.rounds})")
+        if heavy:
+            ok = False
+            print(f"   ❌ módulos pesados carregados no import: {', '.join(heavy)}")
+        else:
+            print(f"   ✅ nenhum de {', '.join(forbidden)} carregado no import")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
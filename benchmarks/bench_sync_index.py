@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da sincronização de rules/stories (automation_intents.add_missing_entries).
+
+Compara a varredura antiga (para cada intent, reescaneia todas as rules e
+seus steps: O(intents × rules × steps)) com o índice (intent, action)
+montado uma única vez, em cenários sintéticos onde metade das intents já
+tem rule e metade precisa ser criada. Também confere que as duas
+abordagens produzem exatamente a mesma lista final.
+
+Exemplo de uso:
+
+python benchmarks/bench_sync_index.py --sizes 500 1000 2000 5000
+"""
+
+import os
+import sys
+import copy
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import automation_intents as ai  # noqa: E402
+
+
+def legacy_add_missing_entries(entries, all_intents, kind):
+    """Implementação anterior (has_rule_for_intent / has_story_for_intent)."""
+
+    def has_entry_for_intent(intent_name):
+        for r in entries:
+            if not isinstance(r, dict):
+                continue
+            steps = r.get("steps") or []
+            has_intent = any(isinstance(s, dict) and s.get("intent") == intent_name for s in steps)
+            if not has_intent:
+                continue
+            target_actions = {f"utter_{intent_name}"}
+            if intent_name == "nlu_fallback":
+                target_actions.add("action_fallback")
+            if any(isinstance(s, dict) and s.get("action") in target_actions for s in steps):
+                return True
+        return False
+
+    added = 0
+    for it in all_intents:
+        if not has_entry_for_intent(it):
+            entries.append({kind: f"{kind}_{it}", "steps": [{"intent": it}, {"action": f"utter_{it}"}]})
+            added += 1
+    return added
+
+
+def synthetic(n_intents):
+    intents = sorted(f"intent_{i:05d}" for i in range(n_intents)) + ["nlu_fallback"]
+    rules = [
+        {"rule": f"rule_intent_{i:05d}", "steps": [{"intent": f"intent_{i:05d}"}, {"action": f"utter_intent_{i:05d}"}]}
+        for i in range(0, n_intents, 2)
+    ]
+    rules.append({"rule": "rule_nlu_fallback", "steps": [{"intent": "nlu_fallback"}, {"action": "action_fallback"}]})
+    return intents, rules
+
+
+def timed(fn, entries, intents):
+    start = time.perf_counter()
+    added = fn(entries, intents, "rule")
+    return time.perf_counter() - start, added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do índice (intent, action) de rules/stories")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 5000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        intents, rules = synthetic(n)
+        legacy_rules, indexed_rules = copy.deepcopy(rules), copy.deepcopy(rules)
+        t_old, added_old = timed(legacy_add_missing_entries, legacy_rules, intents)
+        t_new, added_new = timed(ai.add_missing_entries, indexed_rules, intents)
+        same = "idêntico" if (added_old, legacy_rules) == (added_new, indexed_rules) else "DIFERENTE!"
+        print(
+            f"  • intents={n:6d}  +rules={added_new:6d}  varredura={t_old:8.3f}s  "
+            f"índice={t_new:7.4f}s  ({t_old / t_new:7.1f}x)  resultado={same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""dedupe.py
+
+Poda de exemplos redundantes dentro de uma intent, usada pela geração
+(automation_intents.py --near-dupes).
+
+Duas etapas, sempre mantendo a primeira ocorrência (a ordem do input.txt):
+
+1. Forma normalizada: casefold, sem acentos, sem pontuação, letras esticadas
+   (3+ repetições) encurtadas para duas ("oiiii" -> "oii", mas "carro" e "good"
+   ficam intactos) e palavras repetidas em sequência ("oi oi" -> "oi").
+   Exemplos com a mesma forma normalizada são duplicatas exatas.
+2. Quase-duplicatas: MinHash sobre trigramas de caracteres da forma normalizada +
+   LSH (bandas) para achar candidatos em tempo ~linear; cada candidato é
+   confirmado pelo Jaccard exato antes de ser descartado.
+
+Implementação em Python puro (sem dependências), determinística: as
+permutações do MinHash vêm de um random.Random com semente fixa. Como o
+resultado só depende da lista de exemplos e dos parâmetros, ele é memoizado
+em .cache/near_dupes.pkl: só as intents editadas são reprocessadas.
+"""
+
+import hashlib
+import os
+import pickle
+import random
+import re
+import unicodedata
+import zlib
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+DEFAULT_SIMILARITY = 0.8
+DEFAULT_NUM_PERM = 32
+SHINGLE_SIZE = 3
+MINHASH_SEED = 1
+MERSENNE_PRIME = (1 << 61) - 1
+DEFAULT_CACHE_PATH = os.path.join(".cache", "near_dupes.pkl")
+# Incrementar sempre que a normalização ou o algoritmo mudarem
+PRUNE_VERSION = 2
+
+PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+UNDERSCORE_RE = re.compile(r"_+")
+REPEATED_CHAR_RE = re.compile(r"([^\W\d_])\1{2,}")
+REPEATED_WORD_RE = re.compile(r"\b(\w+)(?: \1\b)+")
+
+
+def normalize_example(text: str) -> str:
+    """Forma canônica de um exemplo para comparação (nunca é gravada em data/*)."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = PUNCTUATION_RE.sub(" ", text)
+    text = UNDERSCORE_RE.sub(" ", text)
+    text = " ".join(text.split())
+    text = REPEATED_CHAR_RE.sub(r"\1\1", text)
+    return REPEATED_WORD_RE.sub(r"\1", text)
+
+
+def shingles(normalized: str, size: int = SHINGLE_SIZE) -> frozenset[str]:
+    """Trigramas de caracteres com bordas de palavra (no estilo do char_wb)."""
+    padded = f" {normalized} "
+    if len(padded) <= size:
+        return frozenset((padded,))
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Escolhe (bandas, linhas por banda) com b*r == num_perm e limiar (1/b)^(1/r) mais próximo do pedido."""
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        # um pouco abaixo do limiar pedido: falsos positivos são filtrados pelo Jaccard exato
+        error = abs((1 / bands) ** (1 / rows) - (threshold - 0.1))
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class PruneResult(NamedTuple):
+    kept: List[str]
+    exact: int
+    near: int
+
+
+class NearDuplicatePruner:
+    """MinHash + LSH com permutações fixas; reutilizável para todas as intents."""
+
+    def __init__(self, threshold: float = DEFAULT_SIMILARITY, num_perm: int = DEFAULT_NUM_PERM) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"Similaridade deve estar em (0, 1]: {threshold}")
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = random.Random(MINHASH_SEED)
+        self.perms = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(self.bands * self.rows)
+        ]
+        self._gram_cache: Dict[str, Tuple[int, ...]] = {}
+
+    def cache_key(self, examples: Sequence[str]) -> str:
+        h = hashlib.sha256(f"{PRUNE_VERSION}|{self.threshold}|{len(self.perms)}".encode("utf-8"))
+        for example in examples:
+            h.update(b"\0" + example.encode("utf-8"))
+        return h.hexdigest()
+
+    def gram_hashes(self, gram: str) -> Tuple[int, ...]:
+        """Valor de cada permutação para um trigrama (memoizado: o vocabulário de trigramas é pequeno)."""
+        values = self._gram_cache.get(gram)
+        if values is None:
+            h = zlib.crc32(gram.encode("utf-8"))
+            values = self._gram_cache[gram] = tuple((a * h + b) % MERSENNE_PRIME for a, b in self.perms)
+        return values
+
+    def signature(self, grams: frozenset[str]) -> List[int]:
+        # mínimo coluna a coluna entre os vetores dos trigramas
+        return list(map(min, zip(*map(self.gram_hashes, grams))))
+
+    def band_keys(self, signature: List[int]) -> List[Tuple[int, ...]]:
+        rows = self.rows
+        return [(band, *signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def prune(self, examples: Sequence[str]) -> PruneResult:
+        """Devolve os exemplos mantidos (na ordem original) e quantos caíram em cada etapa."""
+        kept: List[str] = []
+        kept_grams: List[frozenset[str]] = []
+        seen_normalized: set[str] = set()
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        exact = near = 0
+
+        for example in examples:
+            normalized = normalize_example(example)
+            if normalized in seen_normalized:
+                exact += 1
+                continue
+            seen_normalized.add(normalized)
+
+            grams = shingles(normalized)
+            keys = self.band_keys(self.signature(grams))
+            candidates = {idx for key in keys for idx in buckets.get(key, ())}
+            if any(jaccard(grams, kept_grams[idx]) >= self.threshold for idx in candidates):
+                near += 1
+                continue
+
+            idx = len(kept)
+            kept.append(example)
+            kept_grams.append(grams)
+            for key in keys:
+                buckets.setdefault(key, []).append(idx)
+
+        return PruneResult(kept, exact, near)
+
+
+def load_prune_cache(path: str = DEFAULT_CACHE_PATH) -> Dict[str, PruneResult]:
+    try:
+        with open(path, "rb") as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_prune_cache(cache: Dict[str, PruneResult], path: str = DEFAULT_CACHE_PATH) -> None:
+    """Grava o cache de forma atômica; falha de escrita só custa o recálculo na próxima vez."""
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Verificação/instalação de dependências compartilhada pelos CLIs
+(automation_intents.py e test_intents_from_input.py).
+
+A verificação não roda mais em tempo de import: cada script chama
+ensure_packages() depois do argparse. O resultado fica gravado num stamp em
+.cache/deps, chaveado pelo interpretador e pela lista de pacotes, então as
+execuções seguintes não fazem nenhuma sonda. --install-deps força a verificação
+(e o pip, se faltar algo).
+"""
+
+import os
+import sys
+import hashlib
+import subprocess
+import importlib.util
+from typing import Iterable, List
+
+DEFAULT_STAMP_DIR = os.path.join(".cache", "deps")
+
+
+def stamp_path_for(packages: List[str], stamp_dir: str = DEFAULT_STAMP_DIR) -> str:
+    """Stamp único por (interpretador, pacotes exigidos)."""
+    key = "\n".join([sys.executable, *sorted(packages)])
+    return os.path.join(stamp_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()[:16] + ".ok")
+
+
+def is_installed(package: str) -> bool:
+    """Confere se o pacote existe sem importá-lo (find_spec não executa o módulo)."""
+    try:
+        return importlib.util.find_spec(package) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def ensure_packages(packages: Iterable[str], force: bool = False, stamp_dir: str = DEFAULT_STAMP_DIR) -> None:
+    """Instala via pip os pacotes que estiverem faltando, no máximo uma vez por ambiente.
+
+    Sem force, um stamp existente significa "já verificado" e nada é sondado.
+    """
+    packages = list(packages)
+    stamp = stamp_path_for(packages, stamp_dir)
+    if not force and os.path.exists(stamp):
+        return
+
+    for package in packages:
+        if not is_installed(package):
+            print(f"📦 Instalando dependência ausente: {package} ...")
+            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+
+    try:
+        os.makedirs(stamp_dir, exist_ok=True)
+        with open(stamp, "w", encoding="utf-8") as f:
+            f.write("\n".join(packages) + "\n")
+    except OSError:
+        # sem permissão de escrita: só perdemos o atalho na próxima execução
+        pass
@@ -0,0 +1,481 @@
+"""input_parser.py
+
+Parser compartilhado do arquivo de entrada (input.txt) usado por
+automation_intents.py (geração de data/*) e test_intents_from_input.py
+(harness de testes contra o Rasa).
+
+O arquivo é lido numa única passada, linha a linha, e convertido numa
+representação intermediária (IR) compacta:
+
+- ParsedInput: digest do conteúdo + blocos com #intent + blocos ignorados;
+- IntentBlock: intent, limites locais (#max_pt/#max_en/#max), exemplos
+  por idioma (na ordem de LANGUAGES) e pares de resposta (#vr_pt, #vr_en).
+
+A IR é persistida em .cache/input_ir/ (pickle), indexada pelo hash SHA-256
+do conteúdo do arquivo: enquanto o input.txt não muda, as duas ferramentas
+carregam a IR pronta em vez de re-parsear o arquivo.
+
+Deduplicação global e limites (--max/--max-pt/--max-en) não fazem parte
+da IR; são aplicados por iter_intents(), para que o mesmo cache sirva a
+qualquer combinação de limites.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+LANGUAGES = ("pt", "en")
+DEFAULT_CACHE_DIR = os.path.join(".cache", "input_ir")
+# Incrementar sempre que o formato da IR ou a semântica do parser mudar
+IR_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+# ==========================
+# Scanner de blocos (uma passada por linha)
+# ==========================
+
+# Tipo de cada intent devolvida pelo parser: (intent_path, [pt], [en], [(vr_pt, vr_en), ...])
+IntentEntry = Tuple[str, List[str], List[str], List[Tuple[str, str]]]
+
+# Linha de tag "#nome: resto" — é também o terminador de listas (#pt/#en) e respostas (#vr_en)
+TAG_LINE_RE = re.compile(r"^\s*#(\w+)\s*:(.*)$")
+RP_MARKER_RE = re.compile(r"^\s*#rp\b", re.IGNORECASE)
+LIMIT_TAGS = ("max_pt", "max_en", "max")
+PREVIEW_CHARS = 120
+
+
+def resolve_limits(
+    block_max_pt: int | None,
+    block_max_en: int | None,
+    block_max: int | None,
+    global_max_pt: int | None,
+    global_max_en: int | None,
+    global_max: int | None,
+) -> Tuple[int | None, int | None]:
+    """Resolve limites de exemplos PT/EN considerando tags locais e globais.
+
+    Precedência: #max_pt/#max_en > #max > globais fornecidos em linha de comando.
+    """
+    max_pt, max_en = block_max_pt, block_max_en
+
+    if block_max is not None:
+        max_pt = max_pt if max_pt is not None else block_max
+        max_en = max_en if max_en is not None else block_max
+
+    if max_pt is None:
+        max_pt = global_max_pt if global_max_pt is not None else (global_max if global_max is not None else None)
+    if max_en is None:
+        max_en = global_max_en if global_max_en is not None else (global_max if global_max is not None else None)
+
+    return max_pt, max_en
+
+
+def strip_markers(text: str) -> str:
+    """Remove linhas de marcador como '#rp_', '#rp', etc., mantendo só conteúdo."""
+    lines = text.strip().splitlines()
+    out: List[str] = []
+    for ln in lines:
+        if RP_MARKER_RE.match(ln):
+            continue
+        out.append(ln)
+    return "\n".join(out).strip()
+
+
+class BlockScanner:
+    """Máquina de estados de um bloco do input.txt, alimentada linha a linha.
+
+    Cada linha é examinada uma única vez e atualiza, em paralelo:
+    - #intent: (primeira ocorrência; valor vazio continua na próxima linha não vazia);
+    - #max_pt / #max_en / #max (primeira ocorrência numérica de cada tag);
+    - listas #pt / #en (primeira ocorrência, até a próxima linha de tag);
+    - pares #vr_pt/#vr_en (o #vr_en fecha em nova tag, linha #rp* ou fim do bloco).
+    """
+
+    def __init__(self) -> None:
+        self.has_content = False
+        self.head: List[str] = []
+        self.head_done = False
+        self.intent: str | None = None
+        self.intent_pending = False
+        self.limits: Dict[str, int | None] = {tag: None for tag in LIMIT_TAGS}
+        self.limits_pending: List[str] = []
+        self.examples: Dict[str, List[str]] = {"pt": [], "en": []}
+        self.started_lists: set[str] = set()
+        self.current_list: List[str] | None = None
+        self.vr_state: str | None = None
+        self.vr_pt: List[str] = []
+        self.vr_en: List[str] = []
+        self.responses: List[Tuple[str, str]] = []
+
+    def feed(self, line: str, stripped: str) -> None:
+        if stripped:
+            self.has_content = True
+            if self.intent_pending:
+                self.intent = stripped
+                self.intent_pending = False
+            if self.limits_pending:
+                if stripped.isdecimal():
+                    for tag in self.limits_pending:
+                        if self.limits[tag] is None:
+                            self.limits[tag] = int(stripped)
+                self.limits_pending = []
+        if self.has_content and not self.head_done:
+            self._feed_preview(line, bool(stripped))
+
+        tag: str | None = None
+        rest = ""
+        if stripped.startswith("#"):
+            m = TAG_LINE_RE.match(line)
+            if m:
+                tag = m.group(1).lower()
+                rest = m.group(2)
+
+        # --- #intent / limites ---
+        if tag == "intent" and self.intent is None and not self.intent_pending:
+            if rest.strip():
+                self.intent = rest.strip()
+            else:
+                self.intent_pending = True
+        elif tag in self.limits and self.limits[tag] is None:
+            value = rest.strip()
+            if value.isdecimal():
+                self.limits[tag] = int(value)
+            elif not value:
+                self.limits_pending.append(tag)
+
+        # --- listas #pt / #en ---
+        if self.current_list is not None:
+            if tag is not None:
+                self.current_list = None
+            else:
+                self._add_examples(self.current_list, line)
+        if tag in self.examples and tag not in self.started_lists:
+            # só a primeira ocorrência de cada lista vale
+            self.started_lists.add(tag)
+            self.current_list = self.examples[tag]
+            self._add_examples(self.current_list, rest)
+
+        # --- respostas #vr_pt / #vr_en ---
+        if self.vr_state == "en":
+            if tag is not None or stripped[:3].lower() == "#rp":
+                self._close_response()
+            else:
+                self.vr_en.append(line)
+        elif self.vr_state == "pt":
+            if tag == "vr_en":
+                self.vr_state = "en"
+                self.vr_en = [rest]
+            else:
+                self.vr_pt.append(line)
+        if self.vr_state is None and tag == "vr_pt":
+            self.vr_state = "pt"
+            self.vr_pt = [rest]
+
+    def finish(self) -> Tuple[List[str], List[str], List[Tuple[str, str]]]:
+        """Fecha o bloco e devolve ([pt], [en], [(vr_pt, vr_en), ...])."""
+        if self.vr_state == "en":
+            self._close_response()
+        return self.examples["pt"], self.examples["en"], self.responses
+
+    def preview(self) -> str:
+        return "\n".join(self.head).strip()[:PREVIEW_CHARS]
+
+    def _feed_preview(self, line: str, has_text: bool) -> None:
+        self.head.append(line)
+        if has_text and len(self.preview()) >= PREVIEW_CHARS:
+            self.head_done = True
+
+    @staticmethod
+    def _add_examples(target: List[str], text: str) -> None:
+        # Ignora linhas de controle como '#rp', '#rp_1', etc. e retorna frases cruas (sem '- ')
+        for ln in text.splitlines():
+            cleaned = ln.strip().lstrip("-").strip()
+            if not cleaned:
+                continue
+            if cleaned[:3].lower() == "#rp":
+                continue
+            target.append(cleaned)
+
+    def _close_response(self) -> None:
+        pt = strip_markers("\n".join(self.vr_pt))
+        en = strip_markers("\n".join(self.vr_en))
+        if pt and en:
+            self.responses.append((pt, en))
+        self.vr_state = None
+        self.vr_pt = []
+        self.vr_en = []
+
+
+# ==========================
+# Representação intermediária (IR)
+# ==========================
+
+class IntentBlock(NamedTuple):
+    """Bloco do input.txt com #intent, já extraído (sem dedupe global nem limites)."""
+
+    index: int  # posição do bloco no arquivo, contando só blocos não vazios (1-based)
+    intent: str
+    limits: Tuple[int | None, int | None, int | None]  # (#max_pt, #max_en, #max)
+    examples: Tuple[Tuple[str, ...], ...]  # um tuple por idioma, na ordem de LANGUAGES
+    responses: Tuple[Tuple[str, str], ...]
+
+
+class ParsedInput(NamedTuple):
+    """IR completa de um arquivo de entrada."""
+
+    digest: str
+    blocks: Tuple[IntentBlock, ...]
+    ignored: Tuple[Tuple[int, str], ...]  # (índice do bloco, prévia) dos blocos sem #intent
+
+
+def iter_blocks(file_path: str) -> Iterator[IntentBlock | Tuple[int, str]]:
+    """Percorre o arquivo em streaming e devolve cada bloco não vazio assim que ele fecha.
+
+    Blocos com #intent viram IntentBlock; blocos sem #intent viram (índice, prévia).
+    Só o bloco corrente (entre linhas ---) fica em memória.
+    """
+    idx = 0
+
+    def close_block(scanner: BlockScanner) -> IntentBlock | Tuple[int, str] | None:
+        nonlocal idx
+        pt_examples, en_examples, response_array = scanner.finish()
+        if not scanner.has_content:
+            return None
+        idx += 1
+
+        if scanner.intent is None:
+            return idx, scanner.preview()
+
+        return IntentBlock(
+            index=idx,
+            intent=scanner.intent,
+            limits=(scanner.limits["max_pt"], scanner.limits["max_en"], scanner.limits["max"]),
+            examples=(tuple(pt_examples), tuple(en_examples)),
+            responses=tuple(response_array),
+        )
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        scanner = BlockScanner()
+        for raw_line in f:
+            line = raw_line.rstrip("\n")
+            stripped = line.strip()
+            # separa blocos por linhas contendo só --- (tolerante a espaços)
+            if stripped == "---":
+                block = close_block(scanner)
+                if block is not None:
+                    yield block
+                scanner = BlockScanner()
+                continue
+            scanner.feed(line, stripped)
+
+        block = close_block(scanner)
+        if block is not None:
+            yield block
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 do conteúdo do arquivo, lido em blocos (memória constante)."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def parse_file(file_path: str, digest: str | None = None) -> ParsedInput:
+    """Parseia o arquivo inteiro (sem cache) e devolve a IR."""
+    blocks: List[IntentBlock] = []
+    ignored: List[Tuple[int, str]] = []
+    for block in iter_blocks(file_path):
+        if isinstance(block, IntentBlock):
+            blocks.append(block)
+        else:
+            ignored.append(block)
+    return ParsedInput(digest or file_digest(file_path), tuple(blocks), tuple(ignored))
+
+
+def cache_path_for(file_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Um arquivo de cache por caminho de entrada; o digest fica dentro do arquivo."""
+    abs_path = os.path.abspath(file_path)
+    path_key = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:12]
+    base = os.path.splitext(os.path.basename(abs_path))[0]
+    return os.path.join(cache_dir, f"{base}-{path_key}.pickle")
+
+
+def _read_cache(path: str, digest: str) -> ParsedInput | None:
+    try:
+        with open(path, "rb") as f:
+            version, cached_digest, parsed = pickle.load(f)
+    except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError, pickle.UnpicklingError):
+        return None
+    if version != IR_VERSION or cached_digest != digest:
+        return None
+    return parsed
+
+
+def _write_cache(path: str, parsed: ParsedInput) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((IR_VERSION, parsed.digest, parsed), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Cache é só otimização: falha de escrita não pode derrubar a geração/testes
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_input(file_path: str, use_cache: bool = True, cache_dir: str = DEFAULT_CACHE_DIR) -> ParsedInput:
+    """Devolve a IR do arquivo, reaproveitando o cache quando o conteúdo não mudou."""
+    digest = file_digest(file_path)
+    if not use_cache:
+        return parse_file(file_path, digest)
+
+    path = cache_path_for(file_path, cache_dir)
+    parsed = _read_cache(path, digest)
+    if parsed is None:
+        parsed = parse_file(file_path, digest)
+        _write_cache(path, parsed)
+    return parsed
+
+
+# ==========================
+# Índice global de colisões (mesmo exemplo em mais de uma intent)
+# ==========================
+
+COLLISION_POLICIES = ("first-wins", "drop-all", "fail")
+DEFAULT_COLLISION_POLICY = "first-wins"
+
+# (idioma, chave do exemplo) -> índices (em parsed.blocks) dos blocos onde ele aparece
+CollisionIndex = Dict[Tuple[str, str], List[int]]
+
+
+class Collision(NamedTuple):
+    """Exemplo presente em mais de uma intent (no mesmo idioma)."""
+
+    lang: str
+    text: str  # primeira ocorrência, como está no input
+    intents: Tuple[str, ...]  # intents distintas, na ordem do arquivo
+    blocks: Tuple[int, ...]  # IntentBlock.index de cada ocorrência
+
+
+class CollisionError(ValueError):
+    """Levantada por iter_intents com a política "fail" quando há colisões."""
+
+    def __init__(self, collisions: List[Collision]) -> None:
+        super().__init__(f"{len(collisions)} exemplo(s) aparecem em mais de uma intent")
+        self.collisions = collisions
+
+
+def build_collision_index(parsed: ParsedInput, key: Callable[[str], str] | None = None) -> CollisionIndex:
+    """Uma passada sobre a IR (O(total de exemplos)); key normaliza o texto (default: exato)."""
+    index: CollisionIndex = {}
+    for pos, block in enumerate(parsed.blocks):
+        for lang, lines in zip(LANGUAGES, block.examples):
+            for entry in lines:
+                if not entry:
+                    continue
+                blocks = index.setdefault((lang, key(entry) if key else entry), [])
+                if not blocks or blocks[-1] != pos:
+                    blocks.append(pos)
+    return index
+
+
+def find_collisions(parsed: ParsedInput, index: CollisionIndex, key: Callable[[str], str] | None = None) -> List[Collision]:
+    """Entradas do índice que envolvem intents distintas, na ordem da primeira ocorrência."""
+    collisions: List[Collision] = []
+    for (lang, entry_key), positions in index.items():
+        if len(positions) < 2:
+            continue
+        intents = tuple(dict.fromkeys(parsed.blocks[pos].intent for pos in positions))
+        if len(intents) < 2:
+            continue
+        first = parsed.blocks[positions[0]].examples[LANGUAGES.index(lang)]
+        text = next(entry for entry in first if entry and (key(entry) if key else entry) == entry_key)
+        collisions.append(Collision(lang, text, intents, tuple(parsed.blocks[pos].index for pos in positions)))
+    return collisions
+
+
+# ==========================
+# Resolução: dedupe global + limites
+# ==========================
+
+def iter_intents(
+    parsed: ParsedInput,
+    global_max_pt: int | None,
+    global_max_en: int | None,
+    global_max: int | None,
+    prune: Callable[[List[str]], List[str]] | None = None,
+    policy: str = DEFAULT_COLLISION_POLICY,
+    key: Callable[[str], str] | None = None,
+    collisions: List[Collision] | None = None,
+    sample: Callable[[List[str], int], List[str]] | None = None,
+) -> Iterator[IntentEntry]:
+    """Aplica dedupe global e limites sobre a IR, na ordem dos blocos.
+
+    prune (opcional) recebe os exemplos de um idioma já deduplicados e devolve os que
+    ficam; roda antes dos limites, para que #max conte só exemplos distintos.
+
+    Exemplo repetido em intents diferentes (comparado via key, default: texto exato):
+    - "first-wins": fica só na primeira intent do arquivo (comportamento histórico);
+    - "drop-all": sai de todas as intents envolvidas;
+    - "fail": levanta CollisionError antes de devolver qualquer intent.
+    Se `collisions` for passada, recebe as colisões encontradas (para relatório).
+
+    sample (opcional, ver sampling.py) escolhe quais exemplos ficam quando um limite
+    corta a lista; sem ele, ficam os N primeiros.
+
+    Cada item: (intent_path, [pt_examples], [en_examples], [(vr_pt, vr_en), ...])
+    """
+    if policy not in COLLISION_POLICIES:
+        raise ValueError(f"Política de colisão desconhecida: {policy}")
+
+    found = find_collisions(parsed, build_collision_index(parsed, key), key)
+    if collisions is not None:
+        collisions.extend(found)
+    if found and policy == "fail":
+        raise CollisionError(found)
+    banned = {(c.lang, key(c.text) if key else c.text) for c in found} if policy == "drop-all" else set()
+
+    # O dedupe é sempre por texto exato; key só decide colisões entre intents diferentes
+    # (variantes normalizadas dentro da mesma intent ficam para o --near-dupes)
+    seen: Dict[str, set[str]] = {lang: set() for lang in LANGUAGES}
+    owners: Dict[str, Dict[str, str]] = {lang: {} for lang in LANGUAGES}
+
+    def dedupe_global(lines: Tuple[str, ...], lang: str, intent: str) -> List[str]:
+        seen_global = seen[lang]
+        owner = owners[lang]
+        out_local: List[str] = []
+        for entry in lines:
+            if not entry or entry in seen_global:
+                continue
+            entry_key = key(entry) if key else entry
+            if (lang, entry_key) in banned or owner.setdefault(entry_key, intent) != intent:
+                continue
+            seen_global.add(entry)
+            out_local.append(entry)
+        return out_local
+
+    for block in parsed.blocks:
+        # Limites por bloco + globais
+        max_pt, max_en = resolve_limits(*block.limits, global_max_pt, global_max_en, global_max)
+
+        # limpar e deduplicar globalmente (ninguém repete exemplo em lugar nenhum)
+        pt_examples = dedupe_global(block.examples[0], "pt", block.intent)
+        en_examples = dedupe_global(block.examples[1], "en", block.intent)
+        if prune is not None:
+            pt_examples = prune(pt_examples)
+            en_examples = prune(en_examples)
+
+        # aplicar limites por bloco, se houver
+        if max_pt is not None and len(pt_examples) > max_pt:
+            pt_examples = sample(pt_examples, max_pt) if sample else pt_examples[:max_pt]
+        if max_en is not None and len(en_examples) > max_en:
+            en_examples = sample(en_examples, max_en) if sample else en_examples[:max_en]
+
+        yield block.intent, pt_examples, en_examples, list(block.responses)
@@ -0,0 +1,144 @@
+"""latency.py
+
+Métricas de latência do harness (test_intents_from_input.py).
+
+- LatencyHistogram: histograma no estilo HDR (log-linear). Valores em
+  microssegundos; abaixo de 2^SUB_BUCKET_BITS us cada valor tem seu bucket e,
+  acima, cada potência de 2 é dividida em 2^(SUB_BUCKET_BITS-1) buckets, o que
+  dá erro relativo < 1% em qualquer escala com memória constante (só buckets
+  ocupados vão para o dict). Percentis devolvem o maior valor equivalente do
+  bucket, limitado ao máximo observado, como o HdrHistogram.
+- LatencyTracker: um histograma geral + um por intent e um por idioma, contagem
+  de erros e requisições/erros concluídos por intervalo de tempo (rps ao longo
+  do run). summary() vira o latency.json da pasta do teste.
+
+Os tempos são medidos pelo chamador com time.perf_counter() (relógio monotônico).
+"""
+
+import time
+from typing import Dict, List, Optional
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_MASK = (1 << SUB_BUCKET_BITS) - 1
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def bucket_index(value_us: int) -> int:
+    if value_us <= SUB_BUCKET_MASK:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return (shift << SUB_BUCKET_BITS) | (value_us >> shift)
+
+
+def bucket_upper(index: int) -> int:
+    """Maior valor (us) que cai no bucket `index`."""
+    shift = index >> SUB_BUCKET_BITS
+    mantissa = index & SUB_BUCKET_MASK
+    if shift == 0:
+        return mantissa
+    return ((mantissa + 1) << shift) - 1
+
+
+def percentile_key(p: float) -> str:
+    return f"p{p:g}"
+
+
+class LatencyHistogram:
+    """Histograma log-linear de latências + contagem de erros."""
+
+    __slots__ = ("counts", "requests", "count", "errors", "total_us", "max_us")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.requests = 0  # todas as requisições
+        self.count = 0  # as que têm tempo medido (entram nos percentis)
+        self.errors = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: Optional[float], error: bool = False) -> None:
+        """Registra uma requisição; seconds=None conta só o erro (sem tempo medido)."""
+        self.requests += 1
+        if error:
+            self.errors += 1
+        if seconds is None:
+            return
+        value = max(0, int(seconds * 1_000_000))
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        if value > self.max_us:
+            self.max_us = value
+
+    def value_at_percentile(self, p: float) -> int:
+        if not self.count:
+            return 0
+        target = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(bucket_upper(index), self.max_us)
+        return self.max_us
+
+    def summary(self) -> dict:
+        """Resumo em milissegundos."""
+        out = {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": (self.errors / self.requests) if self.requests else 0.0,
+            "mean_ms": (self.total_us / self.count / 1000.0) if self.count else 0.0,
+        }
+        for p in PERCENTILES:
+            out[f"{percentile_key(p)}_ms"] = self.value_at_percentile(p) / 1000.0
+        out["max_ms"] = self.max_us / 1000.0
+        return out
+
+
+class LatencyTracker:
+    """Latência por requisição agrupada (geral / intent / idioma) + throughput no tempo."""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.overall = LatencyHistogram()
+        self.by_intent: Dict[str, LatencyHistogram] = {}
+        self.by_lang: Dict[str, LatencyHistogram] = {}
+        self.timeline: List[List[int]] = []  # [requisições, erros] por intervalo
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, intent: str, lang: str, seconds: Optional[float], error: bool = False) -> None:
+        now = time.perf_counter()
+        self.overall.record(seconds, error)
+        for groups, key in ((self.by_intent, intent), (self.by_lang, lang)):
+            hist = groups.get(key)
+            if hist is None:
+                hist = groups[key] = LatencyHistogram()
+            hist.record(seconds, error)
+
+        slot = int((now - self.started) / self.interval)
+        while len(self.timeline) <= slot:
+            self.timeline.append([0, 0])
+        self.timeline[slot][0] += 1
+        if error:
+            self.timeline[slot][1] += 1
+        self.finished = now
+
+    def summary(self) -> dict:
+        elapsed = ((self.finished or time.perf_counter()) - self.started)
+        return {
+            "elapsed_s": elapsed,
+            "requests_per_s": (self.overall.requests / elapsed) if elapsed > 0 else 0.0,
+            "overall": self.overall.summary(),
+            "timeline": [
+                {"t": i * self.interval, "requests_per_s": n / self.interval, "errors": e}
+                for i, (n, e) in enumerate(self.timeline)
+            ],
+            "by_lang": {k: v.summary() for k, v in sorted(self.by_lang.items())},
+            "by_intent": {k: v.summary() for k, v in sorted(self.by_intent.items())},
+        }
@@ -0,0 +1,123 @@
+"""prediction_cache.py
+
+Cache em disco (SQLite) das previsões do /model/parse para o
+test_intents_from_input.py (--prediction-cache).
+
+- Chave: (fingerprint do modelo, texto normalizado). O fingerprint vem do
+  /status do servidor (model_id) ou do hash do .tar.gz no modo in-process, então
+  trocar de modelo invalida o cache sozinho: as chaves antigas nunca mais batem.
+- Valor: intent, confiança e a resposta completa (intent_ranking incluído), para
+  que qualquer --raw possa ser servido a partir do cache.
+- Só os KEEP_MODELS fingerprints usados mais recentemente ficam no arquivo.
+- Respostas com erro nunca são guardadas.
+
+Todas as leituras/escritas acontecem na thread principal (no consume/dispatch
+do harness); as escritas são agrupadas e confirmadas em lote.
+"""
+
+import os
+import json
+import time
+from typing import Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "predictions.sqlite")
+KEEP_MODELS = 3
+FLUSH_EVERY = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    model TEXT NOT NULL,
+    text TEXT NOT NULL,
+    intent TEXT,
+    confidence REAL NOT NULL,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (model, text)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS models (
+    model TEXT PRIMARY KEY,
+    last_used REAL NOT NULL
+);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Só espaços: o texto que o tokenizer vê é o mesmo (caixa e acentos importam para o modelo)."""
+    return " ".join(text.split())
+
+
+class PredictionCache:
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._pending = []
+
+        import sqlite3  # import tardio: só quem usa --prediction-cache paga o custo
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO models (model, last_used) VALUES (?, ?)", (fingerprint, time.time())
+        )
+        stale = [
+            row[0] for row in self._conn.execute(
+                "SELECT model FROM models ORDER BY last_used DESC LIMIT -1 OFFSET ?", (KEEP_MODELS,)
+            )
+        ]
+        for model in stale:
+            self._conn.execute("DELETE FROM predictions WHERE model = ?", (model,))
+            self._conn.execute("DELETE FROM models WHERE model = ?", (model,))
+        self._conn.commit()
+
+    def get(self, text: str) -> Optional[Tuple[Optional[str], float, dict]]:
+        """(intent, confiança, resposta) do cache, ou None (e conta o miss)."""
+        row = self._conn.execute(
+            "SELECT intent, confidence, raw FROM predictions WHERE model = ? AND text = ?",
+            (self.fingerprint, normalize_text(text)),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0], row[1], json.loads(row[2])
+
+    def put(self, text: str, intent: Optional[str], confidence: float, raw: dict) -> None:
+        if "error" in raw:
+            return
+        self._pending.append(
+            (self.fingerprint, normalize_text(text), intent, confidence, json.dumps(raw, ensure_ascii=False))
+        )
+        if len(self._pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO predictions (model, text, intent, confidence, raw) VALUES (?, ?, ?, ?, ?)",
+            self._pending,
+        )
+        self._conn.commit()
+        self._pending = []
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def summary(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "path": self.path,
+            "fingerprint": self.fingerprint,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -9,6 +9,9 @@ VENV_DIR = "venv_rasa"
 PYTHON_INSTALLER_PATH = "installers/python-3.10.9-amd64.exe"
 MIN_SUPPORTED_VERSION = (3, 8)
 MAX_SUPPORTED_VERSION = (3, 11)
+# Gerado por: python automation_intents.py --export-json
+JSON_EXPORT_DIR = os.path.join("build", "json")
+FROM_JSON_FLAG = "--from-json"
 
 def print_header(msg):
     print("\n" + "="*60)
@@ -94,7 +97,23 @@ def delete_caches():
 
     print("✅ Caches limpos.\n")
 
-def run_rasa_pipeline(test_file=None):
+def json_train_args():
+    """Argumentos de `rasa train` para treinar a partir da exportação JSON (ou None se ela não existir)."""
+    data_dir = os.path.join(JSON_EXPORT_DIR, "data")
+    domain_path = os.path.join(JSON_EXPORT_DIR, "domain.yml")
+    if not os.path.isfile(os.path.join(data_dir, "nlu.json")) or not os.path.isfile(domain_path):
+        print(f"❌ Exportação JSON não encontrada em `{JSON_EXPORT_DIR}`.")
+        print("   Gere com: python automation_intents.py --export-json")
+        return None
+    return ["--data", data_dir, "--domain", domain_path]
+
+def run_rasa_pipeline(test_file=None, from_json=False):
+    train_args = []
+    if from_json and not test_file:
+        train_args = json_train_args()
+        if train_args is None:
+            return
+
     install_dependencies()
     clear_console()
     delete_caches()
@@ -121,8 +140,8 @@ def run_rasa_pipeline(test_file=None):
             print_header("🧪 Executando testes do Rasa...")
             subprocess.run(python_cmd + ["test", "--stories", test_path], check=True)
         else:
-            print_header("🔧 Treinando modelo do Rasa...")
-            subprocess.run(python_cmd + ["train"], check=True)
+            print_header("🔧 Treinando modelo do Rasa..." + (" (exportação JSON)" if train_args else ""))
+            subprocess.run(python_cmd + ["train"] + train_args, check=True)
 
             print_header("🚀 Iniciando o Rasa Server...")
             subprocess.run(
@@ -165,5 +184,9 @@ if __name__ == "__main__":
 
     # Se quiser passar um arquivo de teste, basta fazer:
     #   python run_rasa.py nome_do_teste.yml
-    test_file = sys.argv[1] if len(sys.argv) > 1 else None
-    run_rasa_pipeline(test_file)
+    # Para treinar a partir da exportação JSON (automation_intents.py --export-json):
+    #   python run_rasa.py --from-json
+    args = [arg for arg in sys.argv[1:] if arg != FROM_JSON_FLAG]
+    from_json = len(args) != len(sys.argv) - 1
+    test_file = args[0] if args else None
+    run_rasa_pipeline(test_file, from_json)
@@ -0,0 +1,171 @@
+"""run_state.py
+
+Estado de um teste rotulado (reports/<run>/run_state.json) para rodadas
+diferenciais do test_intents_from_input.py (--since reports/<run>).
+
+O arquivo guarda o fingerprint do modelo e, por intent, o hash do conjunto de
+exemplos, os stats e a previsão (intent, confiança) de cada exemplo, indexada
+pelo hash de (idioma, texto). Numa rodada com --since:
+
+- se o fingerprint do modelo for diferente (ou desconhecido), nada é reaproveitado;
+- exemplos cujo hash já existe na mesma intent do run anterior são servidos de
+  lá (stats de intents intocadas saem idênticos), e só exemplos novos ou
+  alterados vão para o Rasa.
+
+Exemplos que deram erro de HTTP/parse não são gravados, então são sempre
+consultados de novo.
+
+Também aqui o journal.jsonl: cada resultado é anexado (uma linha JSON, com
+flush por linha) assim que termina, e --resume reports/<run> relê o journal,
+reconstrói stats/CSV a partir dele e só roda o que falta. Linhas com erro não
+contam como concluídas (o exemplo roda de novo) e uma última linha truncada
+por um crash é ignorada.
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, Optional
+
+RUN_STATE_FILE = "run_state.json"
+JOURNAL_FILE = "journal.jsonl"
+RUN_STATE_VERSION = 1
+
+
+def example_hash(lang: str, text: str) -> str:
+    return hashlib.blake2b(f"{lang}\0{text}".encode("utf-8"), digest_size=8).hexdigest()
+
+
+def examples_set_hash(hashes) -> str:
+    return hashlib.blake2b("\n".join(sorted(hashes)).encode("ascii"), digest_size=16).hexdigest()
+
+
+class RunState:
+    """Acumula as previsões do run atual e grava o run_state.json no fim."""
+
+    def __init__(self, fingerprint: Optional[str], input_file: str):
+        self.fingerprint = fingerprint
+        self.input_file = input_file
+        self.intents: Dict[str, Dict[str, list]] = {}
+
+    def add(self, intent: Optional[str], lang: str, text: str, predicted: Optional[str], confidence: float) -> None:
+        key = intent or "__NO_INTENT__"
+        self.intents.setdefault(key, {})[example_hash(lang, text)] = [predicted, round(confidence, 6)]
+
+    def save(self, run_dir: str, stats) -> str:
+        path = os.path.join(run_dir, RUN_STATE_FILE)
+        data = {
+            "version": RUN_STATE_VERSION,
+            "fingerprint": self.fingerprint,
+            "input_file": self.input_file,
+            "intents": {
+                intent: {
+                    "hash": examples_set_hash(examples),
+                    "stats": dict(stats.get(intent, {})),
+                    "examples": examples,
+                }
+                for intent, examples in sorted(self.intents.items())
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        return path
+
+
+class PreviousRun:
+    """Previsões de um run anterior, consultadas por (intent, idioma, texto)."""
+
+    def __init__(self, data: dict):
+        self.fingerprint = data.get("fingerprint")
+        self.intents = data.get("intents", {})
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, case):
+        entry = self.intents.get(case["intent"] or "__NO_INTENT__")
+        hit = entry["examples"].get(example_hash(case["lang"], case["text"])) if entry else None
+        if hit is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        predicted, confidence = hit
+        return predicted, confidence, {"intent": {"name": predicted, "confidence": confidence}}
+
+    def unchanged_intents(self, cases) -> int:
+        """Quantas intents do input atual têm exatamente o mesmo conjunto de exemplos do run anterior."""
+        current: Dict[str, list] = {}
+        for case in cases:
+            current.setdefault(case["intent"] or "__NO_INTENT__", []).append(example_hash(case["lang"], case["text"]))
+        return sum(
+            1 for intent, hashes in current.items()
+            if intent in self.intents and self.intents[intent]["hash"] == examples_set_hash(set(hashes))
+        )
+
+
+def load_previous_run(run_dir: str) -> PreviousRun:
+    path = os.path.join(run_dir, RUN_STATE_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} não existe (o run foi feito antes do --since ou em modo texto livre)")
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != RUN_STATE_VERSION:
+        raise ValueError(f"{path}: versão de run_state incompatível")
+    return PreviousRun(data)
+
+
+class ResultJournal:
+    """Anexa cada resultado concluído ao journal.jsonl da pasta do teste."""
+
+    def __init__(self, run_dir: str):
+        self.path = os.path.join(run_dir, JOURNAL_FILE)
+        # buffering=1: flush a cada linha, um Ctrl-C/crash perde no máximo a linha em curso
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        if self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")  # fecha a linha truncada do crash anterior
+
+    def write(self, case, predicted, confidence: float, raw, latency) -> None:
+        self._file.write(json.dumps({
+            "intent": case["intent"],
+            "lang": case["lang"],
+            "text": case["text"],
+            "predicted": predicted,
+            "confidence": confidence,
+            "raw": raw,
+            "latency": latency,
+        }, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def journal_key(case):
+    return case["intent"], case["lang"], case["text"]
+
+
+def load_journal(run_dir: str):
+    """Resultados concluídos (sem erro) do journal, como (case, pred, conf, raw, latência)."""
+    path = os.path.join(run_dir, JOURNAL_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} não existe")
+    completed = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # linha truncada por um crash no meio da escrita
+            raw = entry.get("raw") or {}
+            if "error" in raw:
+                continue
+            case = {"intent": entry["intent"], "lang": entry["lang"], "text": entry["text"]}
+            completed.append((case, entry["predicted"], entry["confidence"], raw, entry.get("latency")))
+    return completed
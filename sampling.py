@@ -0,0 +1,117 @@
+"""sampling.py
+
+Amostragem de exemplos quando um limite (#max/#max_pt/#max_en ou --max*)
+corta a lista de uma intent. Compartilhado por automation_intents.py (geração)
+e test_intents_from_input.py (harness), para que os dois escolham exatamente
+os mesmos exemplos.
+
+- "head": os N primeiros (comportamento histórico);
+- "diverse": os N exemplos mais diversos via k-center guloso (farthest-point)
+  sobre vetores de n-gramas de caracteres (2..4, com hashing), calculados em
+  lote com NumPy; distância = 1 - cosseno. O primeiro centro vem de um RNG
+  semeado por (seed, conteúdo da lista), então o resultado é determinístico
+  entre execuções e processos.
+
+Os exemplos escolhidos voltam na ordem original do input.
+"""
+
+import zlib
+from typing import Callable, List, Sequence
+
+SAMPLERS = ("head", "diverse")
+DEFAULT_SAMPLER = "head"
+DEFAULT_SEED = 0
+NGRAM_RANGE = (2, 4)
+HASH_BITS = 12
+HASH_DIM = 1 << HASH_BITS
+HASH_PRIME = 1000003
+HASH_MIX = 0x9E3779B97F4A7C15  # Fibonacci hashing: os bits altos viram a coluna
+
+Sampler = Callable[[List[str], int], List[str]]
+
+
+def require_numpy():
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("A amostragem 'diverse' precisa do NumPy (pip install numpy).") from e
+    return np
+
+
+def char_ngram_matrix(examples: Sequence[str]):
+    """Matriz (exemplos x HASH_DIM) de contagens de n-gramas de caracteres, linhas com norma 1.
+
+    Tudo em lote: os exemplos viram um único vetor de code points, o hash de cada
+    n-grama é calculado com aritmética uint64 vetorizada e n-gramas que cruzam a
+    fronteira entre dois exemplos são descartados.
+    """
+    np = require_numpy()
+    padded = [f" {example.casefold()} " for example in examples]
+    codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    owner = np.repeat(np.arange(len(padded)), [len(p) for p in padded])
+
+    prime, mix, shift = np.uint64(HASH_PRIME), np.uint64(HASH_MIX), np.uint64(64 - HASH_BITS)
+    rows = []
+    cols = []
+    low, high = NGRAM_RANGE
+    for n in range(low, high + 1):
+        count = len(codes) - n + 1
+        if count <= 0:
+            continue
+        h = np.full(count, n, dtype=np.uint64)
+        for k in range(n):
+            h = h * prime + codes[k:k + count]
+        valid = owner[:count] == owner[n - 1:n - 1 + count]
+        rows.append(owner[:count][valid])
+        cols.append(((h[valid] * mix) >> shift).astype(np.intp))
+
+    flat = np.concatenate(rows) * HASH_DIM + np.concatenate(cols)
+    matrix = np.bincount(flat, minlength=len(padded) * HASH_DIM).reshape(len(padded), HASH_DIM).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def diverse_sample(examples: List[str], n: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """k-center guloso: a cada passo pega o exemplo mais distante dos já escolhidos."""
+    if n >= len(examples):
+        return list(examples)
+    if n <= 0:
+        return []
+
+    np = require_numpy()
+    vectors = char_ngram_matrix(examples)
+    content = zlib.crc32("\0".join(examples).encode("utf-8"))
+    rng = np.random.default_rng([seed, content])
+
+    # distâncias par a par numa única multiplicação de matrizes
+    distances = 1.0 - vectors @ vectors.T
+
+    first = int(rng.integers(len(examples)))
+    chosen = [first]
+    min_dist = distances[first].copy()
+    min_dist[first] = -np.inf
+    for _ in range(n - 1):
+        # argmax devolve o primeiro empate: determinístico
+        nxt = int(np.argmax(min_dist))
+        chosen.append(nxt)
+        np.minimum(min_dist, distances[nxt], out=min_dist)
+        min_dist[nxt] = -np.inf
+
+    return [examples[i] for i in sorted(chosen)]
+
+
+def make_sampler(method: str = DEFAULT_SAMPLER, seed: int = DEFAULT_SEED) -> Sampler | None:
+    """Função (exemplos, n) -> exemplos para input_parser.iter_intents; None = corte "head"."""
+    if method not in SAMPLERS:
+        raise ValueError(f"Amostragem desconhecida: {method}")
+    if seed < 0:
+        raise ValueError(f"Semente inválida: {seed} (deve ser >= 0)")
+    if method == "head":
+        return None
+    require_numpy()
+
+    def sample(examples: List[str], n: int) -> List[str]:
+        return diverse_sample(examples, n, seed)
+
+    return sample
@@ -7,8 +7,10 @@ e gera um relatório de acertos/erros (modo rotulado)
 ou apenas de previsões (modo texto livre).
 
 - Cria pasta automática por teste: reports/test_XXX_YYYYMMDD_HHMMSS
-- Salva CSV dentro da pasta
+- Salva CSV dentro da pasta (gravado durante o teste)
 - Gera report.html dentro da pasta, lendo o CSV via JS
+- Anexa cada resultado a journal.jsonl: um teste interrompido continua com
+  --resume reports/test_XXX_...
 
 Exemplo de uso:
 
@@ -17,6 +19,11 @@ python test_intents_from_input.py \
   --rasa-url http://localhost:5005/model/parse \
   --workers 15 \
   --progress-every 100
+# engine async (aiohttp): centenas de requisições em voo num único event loop
+python test_intents_from_input.py --engine async --concurrency 200
+
+# sem servidor (CI): carrega o modelo treinado neste processo (opcionalmente em lotes)
+python test_intents_from_input.py --in-process models/ --batch-size 256
 """
 
 import os
@@ -25,26 +32,23 @@ import sys
 import json
 import time
 import argparse
-import subprocess
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-# Dependências mínimas
+import threading
+from itertools import islice
+from collections import Counter, defaultdict
+
+from deps import ensure_packages
+from latency import PERCENTILES, LatencyTracker, percentile_key
+from prediction_cache import DEFAULT_CACHE_PATH, PredictionCache
+from run_state import JOURNAL_FILE, PreviousRun, ResultJournal, RunState, journal_key, load_journal, load_previous_run
+from input_parser import COLLISION_POLICIES, DEFAULT_COLLISION_POLICY, CollisionError, iter_intents, load_input
+from sampling import DEFAULT_SAMPLER, DEFAULT_SEED, SAMPLERS, make_sampler
+
+# Dependências mínimas (verificadas em main(), depois do argparse; ver deps.py)
 REQUIRED_PACKAGES = ["requests"]
-
-
-def install_missing_packages():
-    """Instala pacotes Python que estiverem faltando."""
-    for package in REQUIRED_PACKAGES:
-        try:
-            __import__(package.split('.')[0])
-        except ImportError:
-            print(f"📦 Instalando dependência: {package} ...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-
-
-install_missing_packages()
-import requests  # noqa: E402
+ENGINES = ("thread", "async")
+RAW_MODES = ("none", "top", "full")
+DEFAULT_RAW_MODE = "top"
+IN_FLIGHT_PER_WORKER = 4  # janela do engine thread: requisições pendentes por worker
 
 
 # =============== HELPERS DE PASTA / RUN ================== #
@@ -78,60 +82,14 @@ def slug_to_phrase(slug: str) -> str:
     return phrase or slug
 
 
-def parse_limits(block: str,
-                 global_max_pt: int | None,
-                 global_max_en: int | None,
-                 global_max: int | None):
-    """Lógica de #max_pt / #max_en / #max igual ao seu outro script."""
-    def pick(tag):
-        m = re.search(rf"(?mi)^\s*{tag}\s*:\s*(\d+)\s*$", block)
-        return int(m.group(1)) if m else None
-
-    max_pt = pick('#max_pt')
-    max_en = pick('#max_en')
-    max_both = pick('#max')
-
-    # Precedência: específicos > #max > globais
-    if max_both is not None:
-        max_pt = max_pt if max_pt is not None else max_both
-        max_en = max_en if max_en is not None else max_both
-
-    if max_pt is None:
-        max_pt = global_max_pt if global_max_pt is not None else (global_max if global_max is not None else None)
-    if max_en is None:
-        max_en = global_max_en if global_max_en is not None else (global_max if global_max is not None else None)
-
-    return max_pt, max_en
-
-
-def extract_list(block: str, tag: str):
-    """
-    Extrai lista de exemplos após '#pt:' ou '#en:' até o próximo marcador/tag/---/EOF,
-    ignorando linhas de controle tipo '#rp_1', '#rp', etc.
-    """
-    m = re.search(rf'(?smi)^\s*{re.escape(tag)}\s*:(.*?)(?=^\s*#\w+\s*:|^\s*---\s*$|\Z)', block)
-    if not m:
-        return []
-
-    out = []
-    for ln in m.group(1).splitlines():
-        if not ln.strip():
-            continue
-        cleaned = ln.strip().lstrip('-').strip()
-        if not cleaned:
-            continue
-        # NÃO pode entrar nada que seja marcador de regra/peso: #rp, #rp_1, etc
-        if re.match(r"^\s*#rp", cleaned, flags=re.IGNORECASE):
-            continue
-        out.append(cleaned)
-
-    return out
-
-
 def parse_input_examples(file_path: str,
                          global_max_pt: int | None,
                          global_max_en: int | None,
-                         global_max: int | None):
+                         global_max: int | None,
+                         use_cache: bool = True,
+                         collision_policy: str = DEFAULT_COLLISION_POLICY,
+                         sample_method: str = DEFAULT_SAMPLER,
+                         seed: int = DEFAULT_SEED):
     """
     Lê o input.txt e devolve uma lista de casos de teste (modo ROTULADO):
 
@@ -140,76 +98,38 @@ def parse_input_examples(file_path: str,
       {"intent": "greeting/hello", "lang": "en", "text": "hi"},
       ...
     ]
-    """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
 
-    blocks = [b for b in re.split(r'(?m)^\s*---\s*$', content) if b.strip()]
+    Usa a mesma IR (e o mesmo cache) do automation_intents.py, então dedupe
+    global, política de colisão entre intents, limites #max_pt / #max_en / #max e
+    amostragem (head/diverse + seed, ver sampling.py) seguem exatamente a geração.
+    """
+    parsed = load_input(file_path, use_cache=use_cache)
+    sampler = make_sampler(sample_method, seed)
 
     test_cases = []
-    seen_pt, seen_en = set(), set()
-    ignored_blocks = 0
-
-    def dedupe_global(lines, seen_global):
-        out = []
-        for entry in lines:
-            if entry and entry not in seen_global:
-                seen_global.add(entry)
-                out.append(entry)
-        return out
-
-    for idx, raw in enumerate(blocks, 1):
-        block = raw.strip()
-        if not block:
-            continue
-
-        m_intent = re.search(r'(?mi)^\s*#intent\s*:\s*(.+)$', block)
-        if not m_intent:
-            # Aqui é ok ignorar, esse modo é só pra arquivo rotulado
-            ignored_blocks += 1
-            continue
-        intent = m_intent.group(1).strip()
-
-        # limites desse bloco (seguindo mesma lógica do script de geração)
-        max_pt, max_en = parse_limits(block, global_max_pt, global_max_en, global_max)
-
-        pt_examples = extract_list(block, '#pt')
-        en_examples = extract_list(block, '#en')
-
-        # dedupe global por idioma
-        pt_examples = dedupe_global(list(dict.fromkeys(pt_examples)), seen_pt)
-        en_examples = dedupe_global(list(dict.fromkeys(en_examples)), seen_en)
-
-        # aplicar limites
-        if max_pt is not None:
-            pt_examples = pt_examples[:max_pt]
-        if max_en is not None:
-            en_examples = en_examples[:max_en]
-
-        for ex in pt_examples:
-            test_cases.append({"intent": intent, "lang": "pt", "text": ex})
-        for ex in en_examples:
-            test_cases.append({"intent": intent, "lang": "en", "text": ex})
-
-    if ignored_blocks:
-        print(f"ℹ️  {ignored_blocks} bloco(s) ignorados por falta de #intent: (modo rotulado).")
+    try:
+        for intent, pt_examples, en_examples, _responses in iter_intents(
+            parsed, global_max_pt, global_max_en, global_max, policy=collision_policy, sample=sampler
+        ):
+            for ex in pt_examples:
+                test_cases.append({"intent": intent, "lang": "pt", "text": ex})
+            for ex in en_examples:
+                test_cases.append({"intent": intent, "lang": "en", "text": ex})
+    except CollisionError as e:
+        print(f"❌ {e} (--collision-policy fail).")
+        sys.exit(1)
+
+    if parsed.ignored:
+        # Aqui é ok ignorar, esse modo é só pra arquivo rotulado
+        print(f"ℹ️  {len(parsed.ignored)} bloco(s) ignorados por falta de #intent: (modo rotulado).")
 
     return test_cases
 
 
 # =============== PARSE DE ARQUIVO TEXTO LIVRE (SEM #intent) =============== #
 
-def parse_unlabeled_file(file_path: str):
-    """
-    Lê um arquivo com perguntas livres, uma por linha (sem #intent),
-    e devolve casos de teste com intent=None:
-
-    [
-      {"intent": None, "lang": "?", "text": "oi, tudo bem com você hoje?"},
-      ...
-    ]
-    """
-    cases = []
+def iter_unlabeled_lines(file_path: str):
+    """Linhas utilizáveis de um arquivo de perguntas livres (sem vazias nem comentários '#')."""
     with open(file_path, 'r', encoding='utf-8') as f:
         for line in f:
             text = line.strip()
@@ -218,9 +138,30 @@ def parse_unlabeled_file(file_path: str):
             # Se quiser, dá pra ignorar comentários começando com '#'
             if text.startswith('#'):
                 continue
-            cases.append({"intent": None, "lang": "?", "text": text})
+            yield text
+
+
+def iter_unlabeled_file(file_path: str):
+    """
+    Lê um arquivo com perguntas livres, uma por linha (sem #intent),
+    e gera casos de teste com intent=None, sob demanda:
+
+      {"intent": None, "lang": "?", "text": "oi, tudo bem com você hoje?"}
+
+    Arquivos com milhões de linhas não ficam inteiros em memória.
+    """
+    for text in iter_unlabeled_lines(file_path):
+        yield {"intent": None, "lang": "?", "text": text}
 
-    return cases
+
+def count_unlabeled_file(file_path: str) -> int:
+    """Quantos casos iter_unlabeled_file vai gerar (para o progresso)."""
+    return sum(1 for _ in iter_unlabeled_lines(file_path))
+
+
+def parse_unlabeled_file(file_path: str):
+    """Mesmo que iter_unlabeled_file, mas devolve a lista completa."""
+    return list(iter_unlabeled_file(file_path))
 
 
 # =============== NORMALIZAÇÃO DE INTENTS ================== #
@@ -241,220 +182,624 @@ def normalize_intent(name: str | None) -> str | None:
     return name.split('/')[-1].strip()
 
 
+# =============== SESSÃO HTTP (keep-alive + pool) ================== #
+
+# Uma única requests.Session compartilhada pelas threads: o pool do urllib3 é
+# thread-safe e tem uma conexão por worker, reaproveitada entre requisições.
+# (O Rasa não usa cookies nem redirects, que são o estado mutável da Session.)
+_http_session = None
+_http_session_lock = threading.Lock()
+_gzip_requests = False
+
+
+def configure_http_session(pool_size: int = 1, gzip_requests: bool = False):
+    """Cria a sessão com HTTPAdapter de `pool_size` conexões (use o nº de workers)."""
+    global _http_session, _gzip_requests
+    import requests  # import tardio: --help e erros de argumento não pagam o custo
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), pool_block=True)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    _http_session = session
+    _gzip_requests = gzip_requests
+    return session
+
+
+def get_http_session():
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                configure_http_session()
+    return _http_session
+
+
+def http_connection_stats():
+    """(conexões abertas, requisições feitas) somando os pools do urllib3 da sessão."""
+    if _http_session is None:
+        return 0, 0
+    connections = requests_done = 0
+    for adapter in {id(a): a for a in _http_session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_done += pool.num_requests
+    return connections, requests_done
+
+
+def print_http_stats():
+    connections, requests_done = http_connection_stats()
+    if not requests_done:
+        return
+    reused = requests_done - connections
+    print(
+        f"🔌 HTTP: {requests_done} requisições em {connections} conexão(ões) "
+        f"({reused / requests_done * 100.0:.1f}% reaproveitadas via keep-alive)"
+    )
+
+
+# =============== FINGERPRINT DO MODELO ================== #
+
+def status_url_for(rasa_url: str) -> str:
+    """http://host:5005/model/parse -> http://host:5005/status"""
+    from urllib.parse import urlsplit, urlunsplit
+
+    parts = urlsplit(rasa_url)
+    path = parts.path
+    if path.endswith("/model/parse"):
+        path = path[: -len("/model/parse")]
+    return urlunsplit((parts.scheme, parts.netloc, path.rstrip("/") + "/status", "", ""))
+
+
+def server_model_fingerprint(rasa_url: str, timeout: float = 5.0) -> str | None:
+    """model_id (ou model_file) do /status do servidor; None se não der para saber qual modelo está carregado."""
+    import requests
+
+    try:
+        resp = get_http_session().get(status_url_for(rasa_url), timeout=timeout)
+        data = resp.json() if resp.status_code == 200 else {}
+    except (requests.RequestException, ValueError):
+        return None
+    model = data.get("model_id") or data.get("model_file")
+    return f"server:{model}" if model else None
+
+
+def file_model_fingerprint(model_path: str) -> str:
+    """sha256 do .tar.gz do modelo (modo in-process)."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def model_fingerprint(rasa_url: str, model_path: str | None = None) -> str | None:
+    """Identidade do modelo avaliado: hash do arquivo (in-process) ou /status do servidor."""
+    if model_path:
+        return file_model_fingerprint(model_path)
+    return server_model_fingerprint(rasa_url)
+
+
 # =============== TESTE CONTRA O RASA VIA HTTP ================== #
 
 def call_rasa_parse(rasa_url: str, text: str, timeout: float = 10.0):
     """
     Chama o /model/parse do Rasa e devolve (intent_name, confidence, raw_json).
     """
-    payload = {"text": text}
+    import requests
+
+    session = get_http_session()
+    body, headers = encode_parse_request(text)
     try:
-        resp = requests.post(rasa_url, json=payload, timeout=timeout)
+        resp = session.post(rasa_url, data=body, headers=headers, timeout=timeout)
     except requests.RequestException as e:
         return None, 0.0, {"error": f"HTTP error: {e}"}
 
-    if resp.status_code != 200:
-        return None, 0.0, {"error": f"HTTP {resp.status_code}: {resp.text[:200]}"}
+    return interpret_parse_response(resp.status_code, resp.content)
+
+
+def encode_parse_request(text: str):
+    """Corpo + headers do POST /model/parse (comprimido com gzip se --gzip)."""
+    body = json.dumps({"text": text}).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if _gzip_requests:
+        import gzip
+
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def interpret_parse_response(status: int, body: bytes):
+    """
+    Converte (status HTTP, corpo) do /model/parse em (intent_name, confidence, raw_json).
+
+    Compartilhado pelos engines thread (requests) e async (aiohttp).
+    """
+    if status != 200:
+        return None, 0.0, {"error": f"HTTP {status}: {body[:800].decode('utf-8', 'replace')[:200]}"}
 
     try:
-        data = resp.json()
-    except json.JSONDecodeError:
-        return None, 0.0, {"error": f"Invalid JSON response: {resp.text[:200]}"}
+        data = json.loads(body)
+    except ValueError:
+        return None, 0.0, {"error": f"Invalid JSON response: {body[:800].decode('utf-8', 'replace')[:200]}"}
+
+    return interpret_parse_result(data)
 
+
+def interpret_parse_result(data: dict):
+    """(intent_name, confidence, raw_json) a partir do dict de parse (HTTP ou in-process)."""
     intent = data.get("intent") or {}
     intent_name = intent.get("name")
     confidence = float(intent.get("confidence") or 0.0)
     return intent_name, confidence, data
 
 
+async def call_rasa_parse_async(session, rasa_url: str, text: str, timeout: float = 10.0):
+    """Versão aiohttp de call_rasa_parse (mesmo retorno, mesma interpretação de erros)."""
+    import asyncio
+
+    import aiohttp
+
+    body, headers = encode_parse_request(text)
+    try:
+        async with session.post(rasa_url, data=body, headers=headers,
+                                timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            body = await resp.read()
+            status = resp.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return None, 0.0, {"error": f"HTTP error: {str(e) or type(e).__name__}"}
+
+    return interpret_parse_response(status, body)
+
+
+# =============== MODELO IN-PROCESS (sem servidor) ================== #
+
+def resolve_model_path(path: str) -> str:
+    """Aceita o .tar.gz ou uma pasta (usa o modelo mais recente dela, como o `rasa run`)."""
+    if os.path.isdir(path):
+        import glob
+
+        models = glob.glob(os.path.join(path, "*.tar.gz"))
+        if not models:
+            raise FileNotFoundError(f"Nenhum modelo .tar.gz em {path}")
+        return max(models, key=os.path.getmtime)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Modelo não encontrado: {path}")
+    return path
+
+
+def load_rasa_agent(model_path: str):
+    """
+    Carrega o modelo treinado uma única vez com a API Agent do Rasa 3.x.
+
+    O parse passa a ser uma chamada Python (Agent.parse_message), sem HTTP nem
+    JSON: serve para CI sem `rasa run` e evita o custo de rede por exemplo.
+    """
+    try:
+        from rasa.core.agent import Agent
+    except ImportError as e:
+        raise ImportError(
+            "--in-process precisa do Rasa instalado neste Python (ative o venv_rasa; ver run_rasa.py)."
+        ) from e
+
+    start = time.perf_counter()
+    agent = Agent.load(model_path)
+    if not agent.is_ready():
+        raise RuntimeError(f"Não foi possível carregar o modelo: {model_path}")
+    print(f"🧠 Modelo carregado em processo: {model_path} ({time.perf_counter() - start:.1f}s)")
+    return agent
+
+
+async def call_agent_parse(agent, text: str):
+    """Mesmo retorno de call_rasa_parse, mas direto no Agent (mesmo dict do /model/parse)."""
+    try:
+        data = await agent.parse_message(text)
+    except Exception as e:
+        return None, 0.0, {"error": f"parse error: {e}"}
+    return interpret_parse_result(data)
+
+
+def parse_batch_with_graph(agent, texts):
+    """
+    Roda o grafo NLU do modelo uma vez para o lote inteiro (processor.graph_runner
+    com N mensagens no placeholder), em vez de N execuções com lote 1.
+
+    Reproduz MessageProcessor._parse_message_with_graph do Rasa 3.x, então o
+    dict de cada mensagem é o mesmo do parse individual.
+    """
+    from rasa.core.channels.channel import UserMessage
+    from rasa.engine.constants import PLACEHOLDER_MESSAGE, PLACEHOLDER_TRACKER
+
+    processor = agent.processor
+    target = processor.model_metadata.nlu_target
+    results = processor.graph_runner.run(
+        inputs={PLACEHOLDER_MESSAGE: [UserMessage(text) for text in texts], PLACEHOLDER_TRACKER: None},
+        targets=[target],
+    )
+    parsed = []
+    for message in results[target]:
+        data = {"text": "", "intent": {"name": None, "confidence": 0.0}, "entities": []}
+        if message:
+            data.update(message.as_dict(only_output_properties=True))
+        parsed.append(data)
+    return parsed
+
+
+async def call_agent_parse_batch(agent, texts):
+    """
+    Versão em lote de call_agent_parse. Mensagens "/intent{...}" não passam pelo
+    grafo no Rasa (são desempacotadas direto), então seguem pelo parse individual.
+    """
+    results = [None] * len(texts)
+    graph_idx = []
+    for i, text in enumerate(texts):
+        if text.startswith("/"):
+            results[i] = await call_agent_parse(agent, text)
+        else:
+            graph_idx.append(i)
+
+    if graph_idx:
+        try:
+            parsed = [interpret_parse_result(d) for d in parse_batch_with_graph(agent, [texts[i] for i in graph_idx])]
+        except Exception as e:
+            parsed = [(None, 0.0, {"error": f"batch parse error: {e}"})] * len(graph_idx)
+        for i, result in zip(graph_idx, parsed):
+            results[i] = result
+    return results
+
+
+def tally_result(stats, records, res, labeled: bool, sink=None):
+    """
+    Contabiliza um resultado em stats/records (igual para todos os engines) e
+    devolve a chave da intent. Cada registro também vai para `sink`
+    (ex.: RecordsCsvWriter.write), na hora em que o resultado chega; em modo
+    texto livre, com sink, a previsão não fica em records (só as contagens).
+    """
+    expected = res.expected
+    pred = res.predicted
+
+    if labeled:
+        norm_expected = normalize_intent(expected)
+        norm_pred = normalize_intent(pred)
+        ok = (norm_pred == norm_expected)
+        key = expected or "__NO_INTENT__"
+    else:
+        ok = True  # não faz sentido "erro" aqui
+        key = pred or "__NO_INTENT__"
+
+    stats[key]["total"] += 1
+    if labeled:
+        if ok:
+            stats[key]["correct"] += 1
+        else:
+            stats[key]["wrong"] += 1
+            records.append(res)
+            if sink is not None:
+                sink(res)
+    elif sink is not None:
+        # Em modo texto livre as previsões já saem no sink: guardá-las faria a
+        # memória crescer com o tamanho do input
+        sink(res)
+    else:
+        records.append(res)
+    return key
+
+
+def print_progress(idx: int, n_cases: int, stats, labeled: bool):
+    current_total = sum(v["total"] for v in stats.values())
+    pct = idx / n_cases * 100.0
+    if labeled:
+        current_correct = sum(v["correct"] for v in stats.values())
+        acc = (current_correct / current_total * 100.0) if current_total else 0.0
+        print(
+            f"  • {idx}/{n_cases} exemplos processados "
+            f"({pct:5.1f}%) | acurácia parcial: {acc:5.2f}%"
+        )
+    else:
+        print(
+            f"  • {idx}/{n_cases} exemplos processados "
+            f"({pct:5.1f}%)"
+        )
+
+
+def _intern(value: str | None) -> str | None:
+    return None if value is None else sys.intern(value)
+
+
+class ParseRecord:
+    """
+    Resultado de um exemplo. Compacto: __slots__ (sem __dict__ por registro) e
+    idioma/intents internados, já que se repetem em milhares de registros.
+    """
+
+    __slots__ = ("lang", "text", "expected", "predicted", "confidence", "raw", "latency")
+
+    def __init__(self, lang, text, expected, predicted, confidence, raw, latency):
+        self.lang = _intern(lang)
+        self.text = text
+        self.expected = _intern(expected)  # pode ser None em modo unlabeled
+        self.predicted = _intern(predicted)
+        self.confidence = confidence
+        self.raw = raw  # resposta do Rasa conforme --raw (erros sempre guardados)
+        self.latency = latency  # segundos (perf_counter) só da chamada ao /model/parse
+
+    @property
+    def failed(self) -> bool:
+        return self.raw is not None and "error" in self.raw
+
+
+def trim_raw(raw, raw_mode: str):
+    """
+    Quanto da resposta guardar: "none" (nada), "top" (só a intent do topo) ou
+    "full" (o JSON inteiro, com intent_ranking/entities). Erros ficam sempre.
+    """
+    if raw is None:
+        return None
+    if raw_mode == "full" or "error" in raw:
+        return raw
+    if raw_mode == "none":
+        return None
+    return {"intent": raw.get("intent")}
+
+
+def make_result(case, pred, conf, raw, latency, raw_mode: str = DEFAULT_RAW_MODE):
+    return ParseRecord(case["lang"], case["text"], case["intent"], pred, conf, trim_raw(raw, raw_mode), latency)
+
+
+# Caso "coringa" para exceções inesperadas no worker (o caso real se perdeu)
+EXCEPTION_CASE = {"lang": "??", "text": "", "intent": None}
+
+
+def timed_parse(rasa_url: str, case):
+    """call_rasa_parse cronometrado com relógio monotônico: (case, pred, conf, raw, latência)."""
+    start = time.perf_counter()
+    pred, conf, raw = call_rasa_parse(rasa_url, case["text"])
+    return case, pred, conf, raw, time.perf_counter() - start
+
+
+def worker_exception_result(e: Exception):
+    # Se der erro inesperado no worker, registra como erro genérico
+    return EXCEPTION_CASE, None, 0.0, {"error": f"worker exception: {e}"}, None
+
+
 def run_tests(test_cases,
               rasa_url: str,
               sleep_between: float = 0.0,
               max_tests: int | None = None,
               progress_every: int = 25,
               workers: int = 4,
-              labeled: bool = True):
+              labeled: bool = True,
+              engine: str = "thread",
+              concurrency: int = 100,
+              total_cases: int | None = None,
+              latency: LatencyTracker | None = None,
+              raw_mode: str = DEFAULT_RAW_MODE,
+              sink=None,
+              agent=None,
+              batch_size: int = 1,
+              cache: PredictionCache | None = None,
+              previous: PreviousRun | None = None,
+              state: RunState | None = None,
+              journal: ResultJournal | None = None,
+              completed=None):
     """
     Executa os testes contra o Rasa e devolve:
       - stats
-      - records (erros em modo rotulado, ou todas as previsões em modo texto livre)
+      - records (erros em modo rotulado, ou todas as previsões em modo texto livre sem sink)
 
     labeled=True  -> compara expected vs predicted, calcula acurácia.
     labeled=False -> ignora expected, só conta distribuição de intents preditas.
+
+    engine="thread" -> requests + ThreadPoolExecutor com `workers` threads (workers <= 1: sequencial).
+    engine="async"  -> aiohttp num único event loop, até `concurrency` requisições em voo.
+    agent=<Agent>   -> in-process: parse direto no modelo carregado (load_rasa_agent),
+                       sem servidor; rasa_url/engine são ignorados. Com batch_size > 1,
+                       o grafo NLU roda uma vez por lote (latência = tempo do lote / N).
+
+    test_cases pode ser um iterável (ex.: iter_unlabeled_file) desde que
+    total_cases seja informado: os casos são consumidos sob demanda, com no
+    máximo IN_FLIGHT_PER_WORKER x workers requisições pendentes.
+
+    Com `latency`, cada requisição entra no LatencyTracker (por intent e idioma).
+    Os registros são ParseRecord com a resposta reduzida conforme `raw_mode` e,
+    com `sink`, são gravados à medida que chegam (ver RecordsCsvWriter).
+
+    Com `cache` (PredictionCache), exemplos já previstos para o mesmo modelo são
+    servidos do disco sem chamar o Rasa (e ficam fora das latências); os demais
+    entram no cache assim que terminam. `previous` (PreviousRun, --since) faz o
+    mesmo com as previsões de um run anterior, e `state` (RunState) acumula as
+    previsões deste run para o run_state.json.
+
+    Com `journal` (ResultJournal), cada resultado é anexado ao journal.jsonl
+    assim que termina. `completed` (load_journal, --resume) são resultados de
+    uma execução interrompida: entram nos stats/CSV primeiro e os exemplos
+    correspondentes não são consultados de novo.
     """
-    total_cases = len(test_cases)
+    if total_cases is None:
+        total_cases = len(test_cases)
+    n_cases = total_cases
     if max_tests is not None:
-        test_cases = test_cases[:max_tests]
+        test_cases = islice(test_cases, max_tests)
+        n_cases = min(total_cases, max_tests)
 
-    n_cases = len(test_cases)
     modo = "ROTULADO (#intent)" if labeled else "TEXTO LIVRE (sem #intent)"
     print(f"🔎 Modo: {modo}")
     print(f"🔎 Rodando testes em {n_cases} exemplos (de {total_cases} disponíveis)...")
 
     stats = defaultdict(lambda: {"total": 0, "correct": 0, "wrong": 0})
-    records = []  # aqui vão os ERROS (labeled) ou TODAS as previsões (unlabeled)
+    records = []  # aqui vão os ERROS (labeled) ou TODAS as previsões (unlabeled sem sink)
+    done_count = 0
+
+    def consume(outcome, cached: bool = False, replayed: bool = False):
+        """Recebe (case, pred, conf, raw, latência) de qualquer engine, sempre na thread principal."""
+        nonlocal done_count
+        case, pred, conf, raw, elapsed = outcome
+        if journal is not None and not replayed and case is not EXCEPTION_CASE:
+            journal.write(case, pred, conf, raw if raw_mode == "full" else trim_raw(raw, "top"), elapsed)
+        if cache is not None and not cached:
+            cache.put(case["text"], pred, conf, raw)
+        if state is not None and case is not EXCEPTION_CASE and "error" not in raw:
+            state.add(case["intent"], case["lang"], case["text"], pred, conf)
+        res = make_result(case, pred, conf, raw, elapsed, raw_mode)
+        key = tally_result(stats, records, res, labeled, sink)
+        if latency is not None and not cached:
+            latency.record(key, res.lang, res.latency, res.failed)
+        done_count += 1
+        if progress_every > 0 and (done_count % progress_every == 0 or done_count == n_cases):
+            print_progress(done_count, n_cases, stats, labeled)
+
+    def uncached(cases):
+        """Serve do run anterior/cache o que já foi previsto e só deixa passar o resto para o engine."""
+        for case in cases:
+            if resumed and resumed[journal_key(case)] > 0:
+                resumed[journal_key(case)] -= 1  # já veio do journal
+                continue
+            hit = previous.get(case) if previous is not None else None
+            if hit is None and cache is not None:
+                hit = cache.get(case["text"])
+            if hit is None:
+                yield case
+            else:
+                consume((case, *hit, None), cached=True)
 
-    # Se workers <= 1, modo sequencial
-    if workers <= 1:
+    resumed = Counter()
+    if completed:
+        for outcome in completed:
+            resumed[journal_key(outcome[0])] += 1
+            consume(outcome, cached=True, replayed=True)
+        print(f"⏯️  {len(completed)} resultado(s) retomados do journal")
 
-        for idx, case in enumerate(test_cases, 1):
-            expected = case["intent"]  # pode ser None em modo unlabeled
-            text = case["text"]
-            lang = case["lang"]
+    if cache is not None or previous is not None or resumed:
+        test_cases = uncached(test_cases)
 
-            pred, conf, raw = call_rasa_parse(rasa_url, text)
+    if latency is not None:
+        latency.start()
 
-            if labeled:
-                norm_expected = normalize_intent(expected)
-                norm_pred = normalize_intent(pred)
-                ok = (norm_pred == norm_expected)
-                key = expected or "__NO_INTENT__"
-            else:
-                ok = True  # não faz sentido "erro" aqui
-                key = pred or "__NO_INTENT__"
-
-            stats[key]["total"] += 1
-            if labeled:
-                if ok:
-                    stats[key]["correct"] += 1
-                else:
-                    stats[key]["wrong"] += 1
-                    records.append({
-                        "lang": lang,
-                        "text": text,
-                        "expected": expected,
-                        "predicted": pred,
-                        "confidence": conf,
-                        "raw": raw,
-                    })
-            else:
-                # Em modo texto livre, guardamos TODAS as previsões em records
-                records.append({
-                    "lang": lang,
-                    "text": text,
-                    "expected": expected,
-                    "predicted": pred,
-                    "confidence": conf,
-                    "raw": raw,
-                })
-
-            if progress_every > 0 and (idx % progress_every == 0 or idx == n_cases):
-                current_total = sum(v["total"] for v in stats.values())
-                if labeled:
-                    current_correct = sum(v["correct"] for v in stats.values())
-                    acc = (current_correct / current_total * 100.0) if current_total else 0.0
-                    pct = idx / n_cases * 100.0
-                    print(
-                        f"  • {idx}/{n_cases} exemplos processados "
-                        f"({pct:5.1f}%) | acurácia parcial: {acc:5.2f}%"
-                    )
-                else:
-                    pct = idx / n_cases * 100.0
-                    print(
-                        f"  • {idx}/{n_cases} exemplos processados "
-                        f"({pct:5.1f}%)"
-                    )
+    if agent is not None:
+        import asyncio
+
+        asyncio.run(run_tests_in_process(test_cases, agent, consume, batch_size, sleep_between))
+        return stats, records
+
+    if engine == "async":
+        import asyncio
+
+        asyncio.run(run_tests_async(test_cases, rasa_url, concurrency, consume, sleep_between))
+        return stats, records
 
+    # Se workers <= 1, modo sequencial
+    if workers <= 1:
+        for case in test_cases:
+            consume(timed_parse(rasa_url, case))
             if sleep_between > 0:
                 time.sleep(sleep_between)
-
         return stats, records
 
     # ---------- MODO MULTITHREAD ----------
     def worker(case):
         """Função executada em cada thread."""
-        expected = case["intent"]
-        text = case["text"]
-        lang = case["lang"]
-
-        pred, conf, raw = call_rasa_parse(rasa_url, text)
-        return {
-            "expected": expected,
-            "lang": lang,
-            "text": text,
-            "predicted": pred,
-            "confidence": conf,
-            "raw": raw,
-        }
+        return timed_parse(rasa_url, case)
 
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    # Janela deslizante: só IN_FLIGHT_PER_WORKER x workers futures existem ao
+    # mesmo tempo; cada resultado é consumido (e liberado) assim que termina.
+    window = IN_FLIGHT_PER_WORKER * workers
+    cases = iter(test_cases)
     with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = [executor.submit(worker, case) for case in test_cases]
+        pending = {executor.submit(worker, case) for case in islice(cases, window)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    outcome = fut.result()
+                except Exception as e:
+                    outcome = worker_exception_result(e)
+                consume(outcome)
+                if sleep_between > 0:
+                    time.sleep(sleep_between)
+            pending.update(executor.submit(worker, case) for case in islice(cases, len(done)))
+
+    return stats, records
 
-        for idx, fut in enumerate(as_completed(futures), 1):
-            try:
-                res = fut.result()
-            except Exception as e:
-                # Se der erro inesperado na thread, registra como erro genérico
-                res = {
-                    "expected": None,
-                    "lang": "??",
-                    "text": "",
-                    "predicted": None,
-                    "confidence": 0.0,
-                    "raw": {"error": f"worker exception: {e}"},
-                }
-
-            expected = res["expected"]
-            lang = res["lang"]
-            text = res["text"]
-            pred = res["predicted"]
-            conf = res["confidence"]
-            raw = res["raw"]
-
-            if labeled:
-                norm_expected = normalize_intent(expected)
-                norm_pred = normalize_intent(pred)
-                ok = (norm_pred == norm_expected)
-                key = expected or "__NO_INTENT__"
-            else:
-                ok = True
-                key = pred or "__NO_INTENT__"
-
-            stats[key]["total"] += 1
-            if labeled:
-                if ok:
-                    stats[key]["correct"] += 1
-                else:
-                    stats[key]["wrong"] += 1
-                    records.append({
-                        "lang": lang,
-                        "text": text,
-                        "expected": expected,
-                        "predicted": pred,
-                        "confidence": conf,
-                        "raw": raw,
-                    })
-            else:
-                records.append({
-                    "lang": lang,
-                    "text": text,
-                    "expected": expected,
-                    "predicted": pred,
-                    "confidence": conf,
-                    "raw": raw,
-                })
-
-            if progress_every > 0 and (idx % progress_every == 0 or idx == n_cases):
-                current_total = sum(v["total"] for v in stats.values())
-                if labeled:
-                    current_correct = sum(v["correct"] for v in stats.values())
-                    acc = (current_correct / current_total * 100.0) if current_total else 0.0
-                    pct = idx / n_cases * 100.0
-                    print(
-                        f"  • {idx}/{n_cases} exemplos processados "
-                        f"({pct:5.1f}%) | acurácia parcial: {acc:5.2f}%"
-                    )
-                else:
-                    pct = idx / n_cases * 100.0
-                    print(
-                        f"  • {idx}/{n_cases} exemplos processados "
-                        f"({pct:5.1f}%)"
-                    )
 
+async def run_tests_in_process(test_cases, agent, consume, batch_size: int = 1, sleep_between: float = 0.0):
+    """
+    Engine in-process: um exemplo por vez no event loop do Agent (a inferência é
+    CPU/TensorFlow) ou, com batch_size > 1, lotes pelo grafo NLU.
+    sleep_between (--sleep) é uma pausa assíncrona entre chamadas (ou lotes).
+    """
+    import asyncio
+
+    if batch_size <= 1:
+        for case in test_cases:
+            start = time.perf_counter()
+            pred, conf, raw = await call_agent_parse(agent, case["text"])
+            consume((case, pred, conf, raw, time.perf_counter() - start))
             if sleep_between > 0:
-                time.sleep(sleep_between)
+                await asyncio.sleep(sleep_between)
+        return
+
+    cases = iter(test_cases)
+    while True:
+        batch = list(islice(cases, batch_size))
+        if not batch:
+            break
+        start = time.perf_counter()
+        results = await call_agent_parse_batch(agent, [case["text"] for case in batch])
+        per_example = (time.perf_counter() - start) / len(batch)
+        for case, (pred, conf, raw) in zip(batch, results):
+            consume((case, pred, conf, raw, per_example))
+        if sleep_between > 0:
+            await asyncio.sleep(sleep_between)
+
+
+async def run_tests_async(test_cases, rasa_url: str, concurrency: int, consume, sleep_between: float = 0.0):
+    """
+    Engine async: um event loop, um ClientSession com connector compartilhado
+    (limit = concurrency) e um semáforo limitando as requisições em voo.
 
-    return stats, records
+    As tasks são criadas numa janela de 2 x concurrency (não todas de uma vez) e
+    cada resultado passa por `consume` assim que termina, como no engine thread.
+    Com sleep_between (--sleep), cada vaga do semáforo espera (sem bloquear o loop)
+    depois da sua requisição, fora do tempo medido.
+    """
+    import asyncio
+
+    import aiohttp
+
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.BoundedSemaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def worker(case):
+            async with semaphore:
+                # o tempo na fila do semáforo não conta como latência
+                start = time.perf_counter()
+                pred, conf, raw = await call_rasa_parse_async(session, rasa_url, case["text"])
+                elapsed = time.perf_counter() - start
+                if sleep_between > 0:
+                    await asyncio.sleep(sleep_between)
+            return case, pred, conf, raw, elapsed
+
+        cases = iter(test_cases)
+        pending = {asyncio.ensure_future(worker(case)) for case in islice(cases, 2 * concurrency)}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    outcome = fut.result()
+                except Exception as e:
+                    outcome = worker_exception_result(e)
+                consume(outcome)
+            pending.update(asyncio.ensure_future(worker(case)) for case in islice(cases, len(done)))
 
 
 def print_report(stats, records, labeled: bool):
@@ -489,9 +834,9 @@ def print_report(stats, records, labeled: bool):
             print("\n==================== ERROS (AMOSTRA) ====================")
             max_show = min(30, len(records))
             for i, e in enumerate(records[:max_show], 1):
-                print(f"{i:02d}. [{e['lang']}] \"{e['text']}\"")
-                print(f"      esperado : {e['expected']}")
-                print(f"      predito  : {e['predicted']}  (conf={e['confidence']:.3f})")
+                print(f"{i:02d}. [{e.lang}] \"{e.text}\"")
+                print(f"      esperado : {e.expected}")
+                print(f"      predito  : {e.predicted}  (conf={e.confidence:.3f})")
             if len(records) > max_show:
                 print(f"... (+{len(records) - max_show} erros adicionais não listados)")
 
@@ -512,6 +857,90 @@ def print_report(stats, records, labeled: bool):
         print("\n(Em modo texto livre não há acurácia, só distribuição de previsões.)")
 
 
+def format_latency_line(summary: dict) -> str:
+    percentiles = "  ".join(
+        f"{percentile_key(p)}={summary[percentile_key(p) + '_ms']:7.1f}" for p in PERCENTILES
+    )
+    return f"{percentiles}  max={summary['max_ms']:7.1f} ms  erros={summary['error_rate'] * 100.0:5.2f}%"
+
+
+def print_latency_report(latency: dict):
+    """Resumo de latência/throughput no console (o detalhe por intent fica no latency.json/HTML)."""
+    overall = latency["overall"]
+    print("\n==================== LATÊNCIA (/model/parse) ===========")
+    if not overall["requests"]:
+        print("(nenhuma requisição feita: todas as previsões vieram do cache)")
+        return
+    print(f"Requisições                : {overall['requests']} em {latency['elapsed_s']:.1f}s "
+          f"({latency['requests_per_s']:.1f} req/s)")
+    print(f"Geral : {format_latency_line(overall)}")
+    for lang, summary in latency["by_lang"].items():
+        print(f"[{lang:3s}] : {format_latency_line(summary)}")
+    slowest = sorted(latency["by_intent"].items(), key=lambda kv: kv[1]["p99_ms"], reverse=True)[:5]
+    if slowest:
+        print("Intents mais lentas (p99):")
+        for intent, summary in slowest:
+            print(f"- {str(intent):40s}  p99={summary['p99_ms']:7.1f} ms  n={summary['requests']}")
+
+
+def save_latency_json(latency: dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(latency, f, ensure_ascii=False, indent=2)
+    print(f"⏱️  Latências salvas em: {path}")
+
+
+CSV_HEADER = ["lang", "text", "expected_intent", "predicted_intent", "confidence", "raw_json", "latency_ms"]
+
+
+def record_csv_row(e: ParseRecord):
+    return [
+        e.lang,
+        e.text,
+        "" if e.expected is None else e.expected,
+        e.predicted,
+        f"{e.confidence:.6f}",
+        "" if e.raw is None else json.dumps(e.raw, ensure_ascii=False),
+        "" if e.latency is None else f"{e.latency * 1000.0:.2f}",
+    ]
+
+
+class RecordsCsvWriter:
+    """
+    Grava os registros no CSV à medida que os resultados chegam (sink de
+    run_tests). O arquivo só é criado no primeiro registro, então um teste sem
+    erros continua sem CSV.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, record: ParseRecord) -> None:
+        if self._writer is None:
+            import csv
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file, delimiter=';')
+            self._writer.writerow(CSV_HEADER)
+        self._writer.writerow(record_csv_row(record))
+        self.rows += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"💾 CSV salvo em: {self.path} ({self.rows} registros)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def save_records_csv(records, path: str):
     """
     Salva registros em CSV pra você abrir no Excel/Sheets.
@@ -519,36 +948,26 @@ def save_records_csv(records, path: str):
     Em modo rotulado: só erros.
     Em modo texto livre: todas as previsões.
     """
-    import csv
-
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f, delimiter=';')
-        writer.writerow([
-            "lang", "text", "expected_intent",
-            "predicted_intent", "confidence", "raw_json"
-        ])
+    with RecordsCsvWriter(path) as writer:
         for e in records:
-            writer.writerow([
-                e.get("lang", ""),
-                e.get("text", ""),
-                "" if e.get("expected") is None else e.get("expected"),
-                e.get("predicted"),
-                f"{e.get('confidence', 0.0):.6f}",
-                json.dumps(e.get("raw", {}), ensure_ascii=False),
-            ])
-    print(f"💾 CSV salvo em: {path}")
-
-
-def save_html_report(stats, labeled: bool, run_dir: str, csv_filename: str | None):
+            writer.write(e)
+
+
+def save_html_report(stats, labeled: bool, run_dir: str, csv_filename: str | None,
+                     latency: dict | None = None, cache: dict | None = None):
     """
     Gera um report.html dentro da pasta do teste.
 
     - Usa STATS embutido em JS para mostrar totais e acurácia por intent.
     - Lê o CSV (erros/predictions) via fetch(CSV_FILENAME) para listar exemplos.
+    - Usa LATENCY embutido (o mesmo conteúdo do latency.json) para percentis,
+      req/s ao longo do teste e latência por idioma/intent.
+    - Mostra hits/misses do cache de previsões (--prediction-cache), se usado.
     """
     html_path = os.path.join(run_dir, "report.html")
     stats_json = json.dumps(stats, ensure_ascii=False)
+    latency_json = json.dumps(latency, ensure_ascii=False)  # pode ser null
+    cache_json = json.dumps(cache, ensure_ascii=False)  # pode ser null
     csv_js = json.dumps(csv_filename)  # pode ser None
     labeled_js = "true" if labeled else "false"
 
@@ -794,6 +1213,25 @@ def save_html_report(stats, labeled: bool, run_dir: str, csv_filename: str | Non
       border: 1px solid rgba(148,163,184,0.3);
       color: var(--text-soft);
     }}
+    .timeline {{
+      display: flex;
+      align-items: flex-end;
+      gap: 2px;
+      height: 120px;
+      margin-top: 8px;
+    }}
+    .timeline .bar {{
+      flex: 1;
+      min-width: 2px;
+      background: var(--accent);
+      border-radius: 2px 2px 0 0;
+      display: flex;
+      flex-direction: column;
+      justify-content: flex-end;
+    }}
+    .timeline .bar .err {{
+      background: var(--accent-danger);
+    }}
     @media (max-width: 960px) {{
       .grid-summary {{
         grid-template-columns: repeat(2, minmax(0, 1fr));
@@ -814,6 +1252,7 @@ def save_html_report(stats, labeled: bool, run_dir: str, csv_filename: str | Non
       <div class="subtitle">
         Visão consolidada da qualidade das intents, com breakdown por intent e exemplos de erros.
       </div>
+      <div class="subtitle" id="cache-info" style="display: none;"></div>
     </header>
 
     <section class="grid-summary" id="summary-cards">
@@ -883,12 +1322,54 @@ def save_html_report(stats, labeled: bool, run_dir: str, csv_filename: str | Non
         </div>
       </div>
     </section>
+
+    <section id="latency-section">
+      <div class="section-title">
+        <h3>Latência do /model/parse</h3>
+        <span class="chip" id="latency-chip"></span>
+      </div>
+      <div class="grid-summary" id="latency-cards">
+        <!-- Populado via JS -->
+      </div>
+      <div class="card">
+        <h2>Requisições/s ao longo do teste</h2>
+        <div class="timeline" id="latency-timeline"></div>
+        <div class="helper" id="latency-timeline-hint"></div>
+      </div>
+      <div class="layout-two-cols">
+        <div>
+          <div class="section-title">
+            <h3>Por idioma</h3>
+          </div>
+          <div class="table-wrapper">
+            <table>
+              <thead id="latency-lang-head"></thead>
+              <tbody id="latency-lang-rows"></tbody>
+            </table>
+          </div>
+        </div>
+        <div>
+          <div class="section-title">
+            <h3>Por intent</h3>
+            <span class="chip">ordenado por p99</span>
+          </div>
+          <div class="table-wrapper">
+            <table>
+              <thead id="latency-intent-head"></thead>
+              <tbody id="latency-intent-rows"></tbody>
+            </table>
+          </div>
+        </div>
+      </div>
+    </section>
   </div>
 
   <script>
     const LABELED = {labeled_js};
     const CSV_FILENAME = {csv_js};
     const STATS = {stats_json};
+    const LATENCY = {latency_json};
+    const CACHE = {cache_json};
 
     function computeGlobalStats(stats) {{
       let total = 0;
@@ -1137,9 +1618,111 @@ def save_html_report(stats, labeled: bool, run_dir: str, csv_filename: str | Non
       chip.textContent = `${{filtered.length}} exemplo(s) filtrados`;
     }}
 
+    function fmtMs(v) {{
+      return (v || 0).toFixed(1) + ' ms';
+    }}
+
+    function latencyRow(label, v) {{
+      const errPct = (v.error_rate || 0) * 100;
+      const errCls = errPct === 0 ? 'pill ok' : (errPct < 1 ? 'pill mid' : 'pill bad');
+      return `
+        <td><span class="tag-intent">${{label}}</span></td>
+        <td>${{v.requests}}</td>
+        <td>${{fmtMs(v.p50_ms)}}</td>
+        <td>${{fmtMs(v.p90_ms)}}</td>
+        <td>${{fmtMs(v.p99_ms)}}</td>
+        <td>${{fmtMs(v['p99.9_ms'])}}</td>
+        <td>${{fmtMs(v.max_ms)}}</td>
+        <td><span class="${{errCls}}">${{errPct.toFixed(2)}}%</span></td>
+      `;
+    }}
+
+    function fillLatencyTable(headId, rowsId, title, entries) {{
+      document.getElementById(headId).innerHTML = `
+        <tr><th>${{title}}</th><th>Req.</th><th>p50</th><th>p90</th><th>p99</th><th>p99.9</th><th>Máx</th><th>Erros</th></tr>
+      `;
+      const tbody = document.getElementById(rowsId);
+      tbody.innerHTML = '';
+      for (const [label, v] of entries) {{
+        const tr = document.createElement('tr');
+        tr.innerHTML = latencyRow(label, v);
+        tbody.appendChild(tr);
+      }}
+    }}
+
+    function buildLatencySection() {{
+      const section = document.getElementById('latency-section');
+      if (!LATENCY || !LATENCY.overall.requests) {{
+        section.style.display = 'none';
+        return;
+      }}
+      const o = LATENCY.overall;
+      document.getElementById('latency-chip').textContent =
+        `${{o.requests}} requisições em ${{LATENCY.elapsed_s.toFixed(1)}}s`;
+
+      const errPct = (o.error_rate || 0) * 100;
+      const cards = [
+        {{ title: 'p50 / p90', value: fmtMs(o.p50_ms), valueClass: '', helper: 'p90: ' + fmtMs(o.p90_ms) + ' • média: ' + fmtMs(o.mean_ms) }},
+        {{ title: 'p99', value: fmtMs(o.p99_ms), valueClass: '', helper: 'Cauda: 1 em 100 requisições é mais lenta.' }},
+        {{ title: 'p99.9 / Máx', value: fmtMs(o['p99.9_ms']), valueClass: '', helper: 'Máximo observado: ' + fmtMs(o.max_ms) }},
+        {{
+          title: 'Throughput',
+          value: LATENCY.requests_per_s.toFixed(1) + ' req/s',
+          valueClass: errPct === 0 ? 'good' : (errPct < 1 ? 'warn' : 'bad'),
+          helper: 'Erros: ' + o.errors + ' (' + errPct.toFixed(2) + '%)'
+        }}
+      ];
+      const container = document.getElementById('latency-cards');
+      container.innerHTML = '';
+      for (const c of cards) {{
+        const card = document.createElement('div');
+        card.className = 'card';
+        const valClass = c.valueClass ? 'value ' + c.valueClass : 'value';
+        card.innerHTML = `
+          <h2>${{c.title}}</h2>
+          <div class="${{valClass}}">${{c.value}}</div>
+          <div class="helper">${{c.helper}}</div>
+        `;
+        container.appendChild(card);
+      }}
+
+      const timeline = document.getElementById('latency-timeline');
+      const peak = Math.max(1, ...LATENCY.timeline.map(p => p.requests_per_s));
+      for (const p of LATENCY.timeline) {{
+        const bar = document.createElement('div');
+        bar.className = 'bar';
+        bar.style.height = (p.requests_per_s / peak * 100) + '%';
+        bar.title = `t=${{p.t}}s: ${{p.requests_per_s.toFixed(1)}} req/s, ${{p.errors}} erro(s)`;
+        if (p.errors) {{
+          const err = document.createElement('div');
+          err.className = 'err';
+          err.style.height = (p.errors / Math.max(1, p.requests_per_s) * 100) + '%';
+          bar.appendChild(err);
+        }}
+        timeline.appendChild(bar);
+      }}
+      document.getElementById('latency-timeline-hint').textContent =
+        `Pico: ${{peak.toFixed(1)}} req/s • em vermelho, a fração de erros em cada intervalo.`;
+
+      fillLatencyTable('latency-lang-head', 'latency-lang-rows', 'Idioma', Object.entries(LATENCY.by_lang));
+      const intents = Object.entries(LATENCY.by_intent).sort((a, b) => b[1].p99_ms - a[1].p99_ms);
+      fillLatencyTable('latency-intent-head', 'latency-intent-rows', 'Intent', intents);
+    }}
+
+    function showCacheInfo() {{
+      if (!CACHE) return;
+      const el = document.getElementById('cache-info');
+      el.style.display = '';
+      el.innerHTML = `Cache de previsões: <span class="badge-soft">${{CACHE.hits}} hits</span>
+        <span class="badge-soft">${{CACHE.misses}} misses</span>
+        (${{(CACHE.hit_rate * 100).toFixed(1)}}% servidos do cache; latências só das requisições reais)`;
+    }}
+
     document.addEventListener('DOMContentLoaded', () => {{
+      showCacheInfo();
       createSummaryCards();
       buildIntentTable();
+      buildLatencySection();
       loadErrorsCsv();
 
       const input = document.getElementById('search-input');
@@ -1230,66 +1813,279 @@ def main():
         default=4,
         help="Número de threads (workers) para chamadas paralelas ao Rasa (default: 4).",
     )
+    parser.add_argument(
+        "--in-process",
+        dest="in_process",
+        metavar="MODEL",
+        default=None,
+        help="Carrega o modelo (models/<modelo>.tar.gz ou a pasta models/) neste processo e faz o parse "
+             "direto, sem servidor HTTP (precisa do Rasa instalado). Ignora --rasa-url/--engine.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=1,
+        help="Com --in-process: exemplos por execução do grafo NLU (ex.: 256). 1 = um por vez (default: 1).",
+    )
+    parser.add_argument(
+        "--engine",
+        dest="engine",
+        choices=ENGINES,
+        default="thread",
+        help="thread: requests + ThreadPoolExecutor (--workers); async: aiohttp num event loop (--concurrency) (default: thread).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        dest="concurrency",
+        type=int,
+        default=100,
+        help="Requisições em voo no engine async (default: 100).",
+    )
+    parser.add_argument(
+        "--prediction-cache",
+        dest="prediction_cache",
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        default=None,
+        metavar="PATH",
+        help=f"Reaproveita previsões já feitas para o mesmo modelo (SQLite, default: {DEFAULT_CACHE_PATH}). "
+             "O modelo é identificado pelo /status do servidor ou pelo hash do --in-process; "
+             "exemplos vindos do cache não entram nas latências.",
+    )
+    parser.add_argument(
+        "--since",
+        dest="since",
+        metavar="RUN_DIR",
+        default=None,
+        help="Rodada diferencial: reaproveita os resultados de reports/<run> (run_state.json) para exemplos "
+             "inalterados, se o modelo for o mesmo, e só consulta exemplos novos/alterados.",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        metavar="RUN_DIR",
+        default=None,
+        help="Retoma um teste interrompido: relê reports/<run>/journal.jsonl, reconstrói stats/CSV e só roda "
+             "os exemplos que faltam (use os mesmos argumentos do teste original).",
+    )
+    parser.add_argument(
+        "--raw",
+        dest="raw",
+        choices=RAW_MODES,
+        default=DEFAULT_RAW_MODE,
+        help="Quanto da resposta do Rasa guardar no CSV: none, top (só a intent do topo) ou full "
+             "(JSON inteiro, com intent_ranking) (default: top).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Ignora o cache da IR do input (.cache/input_ir) e re-parseia o arquivo.",
+    )
+    parser.add_argument(
+        "--collision-policy",
+        dest="collision_policy",
+        choices=COLLISION_POLICIES,
+        default=DEFAULT_COLLISION_POLICY,
+        help=f"Exemplo repetido em intents diferentes, como na geração (default: {DEFAULT_COLLISION_POLICY}).",
+    )
+    parser.add_argument(
+        "--gzip",
+        dest="gzip",
+        action="store_true",
+        help="Envia o corpo das requisições comprimido (Content-Encoding: gzip); só para servidores/proxies que aceitam.",
+    )
+    parser.add_argument(
+        "--sample",
+        dest="sample",
+        choices=SAMPLERS,
+        default=DEFAULT_SAMPLER,
+        help="Quais exemplos ficam quando um limite corta a lista, como na geração: head ou diverse (NumPy) (default: head).",
+    )
+    parser.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help=f"Semente da amostragem diverse (default: {DEFAULT_SEED}).",
+    )
+    parser.add_argument(
+        "--install-deps",
+        dest="install_deps",
+        action="store_true",
+        help="Verifica/instala as dependências via pip mesmo que já tenham sido verificadas neste ambiente.",
+    )
 
     args = parser.parse_args()
+    if args.seed < 0:
+        parser.error("--seed deve ser >= 0")
+
+    use_aiohttp = args.engine == "async" and not args.in_process
+    ensure_packages(REQUIRED_PACKAGES + (["aiohttp"] if use_aiohttp else []), force=args.install_deps)
 
     if not os.path.exists(args.input_file):
         print(f"❌ Arquivo de entrada não encontrado: {args.input_file}")
         sys.exit(1)
 
     # 1) Tenta ler como arquivo ROTULADO (input.txt-style)
-    cases = parse_input_examples(
-        args.input_file,
-        global_max_pt=args.max_pt,
-        global_max_en=args.max_en,
-        global_max=args.max_both,
-    )
+    try:
+        cases = parse_input_examples(
+            args.input_file,
+            global_max_pt=args.max_pt,
+            global_max_en=args.max_en,
+            global_max=args.max_both,
+            use_cache=args.use_cache,
+            collision_policy=args.collision_policy,
+            sample_method=args.sample,
+            seed=args.seed,
+        )
+    except ImportError as e:  # --sample diverse sem NumPy, como na geração
+        parser.error(str(e))
 
     labeled = True
+    total_cases = len(cases)
     if not cases:
-        # 2) Se não achou #intent, cai para modo TEXTO LIVRE
+        # 2) Se não achou #intent, cai para modo TEXTO LIVRE (lido sob demanda)
         print("⚠️ Nenhum bloco com #intent encontrado. "
               "Interpretando arquivo como perguntas soltas (sem rótulo)...")
-        cases = parse_unlabeled_file(args.input_file)
+        cases = iter_unlabeled_file(args.input_file)
+        total_cases = count_unlabeled_file(args.input_file)
         labeled = False
 
-    if not cases:
+    if not total_cases:
         print("⚠️ Nenhuma linha utilizável encontrada no arquivo. Verifique o conteúdo.")
         sys.exit(1)
 
-    print(f"✅ {len(cases)} exemplos carregados de {args.input_file}")
-
-    # 2) Roda testes contra o Rasa
-    stats, records = run_tests(
-        cases,
-        rasa_url=args.rasa_url,
-        sleep_between=args.sleep,
-        max_tests=args.max_tests,
-        progress_every=args.progress_every,
-        workers=args.workers,
-        labeled=labeled,
-    )
-
-    # 3) Cria pasta do teste
-    run_dir = create_test_run_dir()
+    print(f"✅ {total_cases} exemplos carregados de {args.input_file}")
 
-    # 4) Salva CSV de erros/previsões (se houver registros)
-    csv_filename = None
-    if records:
-        if args.errors_file:
-            csv_filename = os.path.basename(args.errors_file)
+    # Modo in-process: carrega o modelo antes de criar a pasta do teste
+    agent = None
+    model_path = None
+    if args.in_process:
+        try:
+            model_path = resolve_model_path(args.in_process)
+            agent = load_rasa_agent(model_path)
+        except (ImportError, FileNotFoundError, RuntimeError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+    # Fingerprint do modelo: chave do cache de previsões e do run_state.json (--since)
+    configure_http_session(args.workers, gzip_requests=args.gzip)
+    fingerprint = None
+    if args.prediction_cache or labeled:
+        fingerprint = model_fingerprint(args.rasa_url, model_path)
+
+    cache = None
+    if args.prediction_cache:
+        if fingerprint is None:
+            print(f"⚠️ Não foi possível identificar o modelo em {status_url_for(args.rasa_url)}; "
+                  "cache de previsões desativado neste teste.")
         else:
-            csv_filename = "errors_labeled.csv" if labeled else "predictions_free.csv"
-        csv_path = os.path.join(run_dir, csv_filename)
-        save_records_csv(records, csv_path)
+            cache = PredictionCache(args.prediction_cache, fingerprint)
+            print(f"🗃️  Cache de previsões: {args.prediction_cache} (modelo {fingerprint[:40]})")
+
+    # Rodada diferencial: reaproveita exemplos inalterados de um run anterior do mesmo modelo
+    previous = None
+    if args.since:
+        if not labeled:
+            print("⚠️ --since só vale para arquivos rotulados (#intent); rodando tudo.")
+        else:
+            try:
+                previous = load_previous_run(args.since)
+            except (OSError, ValueError) as e:
+                print(f"❌ --since: {e}")
+                sys.exit(1)
+            if fingerprint is None or previous.fingerprint != fingerprint:
+                print(f"⚠️ --since: o modelo mudou desde {args.since} (ou não foi possível identificá-lo); "
+                      "rodando tudo.")
+                previous = None
+            else:
+                print(f"♻️  --since {args.since}: {previous.unchanged_intents(cases)} intent(s) sem mudanças; "
+                      "só exemplos novos/alterados vão para o Rasa.")
+    state = RunState(fingerprint, args.input_file) if labeled else None
+
+    # 2) Cria pasta do teste antes de rodar: o CSV e o journal são gravados durante
+    #    o teste (com --resume, continua na pasta do teste interrompido)
+    completed = None
+    if args.resume:
+        try:
+            completed = load_journal(args.resume)
+        except OSError as e:
+            print(f"❌ --resume: {e}")
+            sys.exit(1)
+        run_dir = args.resume
+        print(f"⏯️  Retomando {run_dir}")
+    else:
+        run_dir = create_test_run_dir()
+    if args.errors_file:
+        csv_filename = os.path.basename(args.errors_file)
     else:
+        csv_filename = "errors_labeled.csv" if labeled else "predictions_free.csv"
+    csv_writer = RecordsCsvWriter(os.path.join(run_dir, csv_filename))
+
+    # 3) Roda testes contra o Rasa (thread: sessão keep-alive com uma conexão por
+    #    worker; async: connector aiohttp com até --concurrency conexões;
+    #    in-process: direto no Agent carregado acima)
+    latency = LatencyTracker()
+    try:
+        with csv_writer, ResultJournal(run_dir) as journal:
+            stats, records = run_tests(
+                cases,
+                rasa_url=args.rasa_url,
+                sleep_between=args.sleep,
+                max_tests=args.max_tests,
+                progress_every=args.progress_every,
+                workers=args.workers,
+                labeled=labeled,
+                engine=args.engine,
+                concurrency=args.concurrency,
+                total_cases=total_cases,
+                latency=latency,
+                raw_mode=args.raw,
+                sink=csv_writer.write,
+                agent=agent,
+                batch_size=args.batch_size,
+                cache=cache,
+                previous=previous,
+                state=state,
+                journal=journal,
+                completed=completed,
+            )
+    except KeyboardInterrupt:
+        if cache is not None:
+            cache.close()
+        print(f"\n⏸️  Interrompido. Os resultados concluídos estão em {os.path.join(run_dir, JOURNAL_FILE)}; "
+              f"retome com: --resume {run_dir}")
+        sys.exit(130)
+    print_http_stats()
+    cache_summary = None
+    if cache is not None:
+        cache.close()
+        cache_summary = cache.summary()
+        print(
+            f"🗃️  Cache de previsões: {cache_summary['hits']} hits / {cache_summary['misses']} misses "
+            f"({cache_summary['hit_rate'] * 100.0:.1f}% servidos do cache)"
+        )
+    if previous is not None:
+        print(f"♻️  --since: {previous.hits} exemplos reaproveitados do run anterior, {previous.misses} novos/alterados")
+    if state is not None:
+        state.save(run_dir, stats)
+    latency_summary = latency.summary()
+
+    # 4) CSV de erros/previsões já gravado durante o teste (se houve registros)
+    if not csv_writer.rows:
+        csv_filename = None
         print("ℹ️ Nenhum registro para CSV (sem erros em modo rotulado ou sem previsões em texto livre).")
 
+    save_latency_json(latency_summary, os.path.join(run_dir, "latency.json"))
+
     # 5) Mostra relatório em texto
     print_report(stats, records, labeled=labeled)
+    print_latency_report(latency_summary)
 
     # 6) Gera HTML bonito
-    save_html_report(stats, labeled, run_dir, csv_filename)
+    save_html_report(stats, labeled, run_dir, csv_filename, latency=latency_summary, cache=cache_summary)
 
 
 if __name__ == "__main__":